@@ -3,5 +3,5 @@
 set -eu
 
 pulp-docs fetch --fetch-all --dest /tmp/fetchdir
-pulp-docs build --path "pulp-docs@..:/tmp/fetchdir"
+pulp-docs build --path "pulp-docs@..:/tmp/fetchdir" --no-git-dirty-check
 ls site || (echo "ERROR: something went wrong, 'site/' dir doesn't exist"; exit 1)
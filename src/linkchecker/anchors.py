@@ -0,0 +1,126 @@
+import html
+import re
+import typing as t
+from urllib.parse import unquote
+
+from markdown.extensions.toc import slugify as toc_slugify
+from markdown.extensions.toc import unique
+
+Slugify = t.Callable[[str, str], str]
+
+# Scans markdown for the elements that get an id in the rendered page.
+# Fenced code is consumed first, so headings inside it are ignored.
+ANCHOR_SCANNER = re.compile(
+    # fenced code block, up to its closing fence or the end of the document
+    r"(?P<fence>^[ \t]*(?P<fence_chars>`{3,}|~{3,})[\s\S]*?"
+    r"(?:^[ \t]*(?P=fence_chars)[`~]*[ \t]*$|\Z))"
+    # atx headings: ## Title ##
+    r"|^ {0,3}#{1,6}[ \t]+(?P<atx>[^\n]*?)(?:[ \t]+#+)?[ \t]*$"
+    # setext headings: a line of text underlined with = or -
+    r"|^ {0,3}(?P<setext>[^\s#>=\-][^\n]*)\n {0,3}(?:=+|-+)[ \t]*$"
+    # content tabs: === "Title"
+    r'|^[ \t]*===[!+]*[ \t]+"(?P<tab>[^"\n]*)"'
+    # attr_list ids: { #some-id }
+    r"|\{:?[^}\n]*?#(?P<attr_id>[^\s}]+)[^}\n]*\}"
+    # html ids: <a id="some-id"> or <a name="some-id">
+    r"|<[^>\n]*?\b(?:id|name)=[\"'](?P<html_id>[^\"'\n]+)[\"']",
+    re.MULTILINE,
+)
+HEADING_ATTR_ID = re.compile(r"[ \t]*\{:?[^}]*?#([^\s}]+)[^}]*\}[ \t]*$")
+FRONT_MATTER = re.compile(r"\A---[ \t]*\n[\s\S]*?^(?:---|\.\.\.)[ \t]*$", re.MULTILINE)
+INLINE_MARKUP = [
+    (re.compile(r"!?\[([^\]]*)\]\([^)]*\)"), r"\1"),  # links and images
+    (re.compile(r"!?\[([^\]]*)\]\[[^\]]*\]"), r"\1"),  # reference links
+    (re.compile(r"`+"), ""),  # inline code
+    (re.compile(r"(\*{1,3}|_{1,3})(\S(?:.*?\S)?)\1"), r"\2"),  # emphasis
+    (re.compile(r"</?[^>]*>"), ""),  # html tags
+]
+
+
+class SlugRules(t.NamedTuple):
+    """How the markdown extensions turn titles into ids.
+
+    Args:
+        slugify: The toc slugify function.
+        separator: The toc word separator.
+        tab_slugify: The pymdownx.tabbed slugify function, if tabs get ids from their titles.
+        tab_separator: The pymdownx.tabbed word separator.
+    """
+
+    slugify: Slugify = toc_slugify
+    separator: str = "-"
+    tab_slugify: t.Optional[Slugify] = None
+    tab_separator: str = "-"
+
+    @classmethod
+    def from_mdx_configs(cls, mdx_configs: dict[str, dict[str, t.Any]]) -> "SlugRules":
+        """Read the rules from the markdown extension configs of a mkdocs config."""
+        toc_config = mdx_configs.get("toc", {})
+        tabbed_config = mdx_configs.get("pymdownx.tabbed", {})
+        tab_slugify = tabbed_config.get("slugify")
+        return cls(
+            slugify=toc_config.get("slugify", toc_slugify),
+            separator=toc_config.get("separator", "-"),
+            tab_slugify=tab_slugify if callable(tab_slugify) else None,
+            tab_separator=tabbed_config.get("separator", "-"),
+        )
+
+
+class AnchorIndex:
+    """Lazily built index of the anchors of markdown files.
+
+    The anchors of a file are extracted the first time it's looked up and cached for the
+    rest of the run, so only files that are the target of some link are ever parsed.
+
+    Args:
+        rules: The slugify rules of the site.
+    """
+
+    def __init__(self, rules: SlugRules | None = None):
+        self.rules = rules or SlugRules()
+        self._anchors: dict[str, frozenset[str]] = {}
+
+    def has_anchor(self, filename: str, fragment: str) -> bool:
+        """Return True if fragment is an anchor of the markdown file at filename."""
+        anchors = self._anchors.get(filename)
+        if anchors is None:
+            anchors = self._anchors[filename] = self._read_anchors(filename)
+        return unquote(fragment) in anchors
+
+    def _read_anchors(self, filename: str) -> frozenset[str]:
+        try:
+            with open(filename, "r") as fd:
+                text = fd.read()
+        except (OSError, UnicodeDecodeError):
+            return frozenset()
+        return frozenset(extract_anchors(text, self.rules))
+
+
+def extract_anchors(text: str, rules: SlugRules | None = None) -> set[str]:
+    """Return the ids that the headings, tabs and explicit anchors of text get."""
+    rules = rules or SlugRules()
+    text = FRONT_MATTER.sub("", text, count=1)
+    ids: set[str] = set()
+    for match in ANCHOR_SCANNER.finditer(text):
+        kind = match.lastgroup
+        if kind in ("atx", "setext"):
+            title = match.group(kind)
+            attr_id = HEADING_ATTR_ID.search(title)
+            if attr_id:
+                ids.add(attr_id.group(1))
+                continue
+            unique(rules.slugify(strip_inline_markup(title), rules.separator), ids)
+        elif kind == "tab":
+            if rules.tab_slugify:
+                title = strip_inline_markup(match.group("tab"))
+                unique(rules.tab_slugify(title, rules.tab_separator), ids)
+        elif kind in ("attr_id", "html_id"):
+            ids.add(match.group(kind))
+    return ids
+
+
+def strip_inline_markup(title: str) -> str:
+    """Approximate the text of a rendered title, which is what gets slugified."""
+    for pattern, replacement in INLINE_MARKUP:
+        title = pattern.sub(replacement, title)
+    return html.unescape(title).strip()
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import typing as t
+from collections import defaultdict
+
+from linkchecker.index import normalize_target
+
+LINK_INDEX_VERSION = 1
+
+
+class DocsChanges(t.NamedTuple):
+    """Files changed since some git ref, relative to the component directory.
+
+    Args:
+        changed: Files that were added or modified, including the new path of renames.
+        removed: Files that were deleted, including the old path of renames.
+    """
+
+    changed: set[str]
+    removed: set[str]
+
+
+def changes_since(basedir: str, ref: str) -> DocsChanges:
+    """Return the files under basedir that changed since ref.
+
+    Changes are taken from the merge base of ref and HEAD, as a PR check would see them,
+    and include uncommitted and untracked files.
+
+    Raises:
+        RuntimeError: If git fails, e.g, basedir isn't in a repository or ref is unknown.
+    """
+    merge_base = _git(basedir, "merge-base", ref, "HEAD").strip()
+    diff = _git(basedir, "diff", "--name-status", "-z", "-M", "--relative", merge_base, "--")
+    untracked = _git(basedir, "ls-files", "-z", "--others", "--exclude-standard")
+    changes = DocsChanges(changed=set(), removed=set())
+    fields = iter(diff.split("\0"))
+    for status in fields:
+        if not status:
+            continue
+        if status[0] in "RC":
+            old_path, new_path = next(fields), next(fields)
+            if status[0] == "R":
+                changes.removed.add(old_path)
+            changes.changed.add(new_path)
+        elif status[0] == "D":
+            changes.removed.add(next(fields))
+        else:
+            changes.changed.add(next(fields))
+    changes.changed.update(path for path in untracked.split("\0") if path)
+    return changes
+
+
+def _git(basedir: str, *args: str) -> str:
+    try:
+        result = subprocess.run(
+            ["git", "-C", basedir, *args], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError) as e:
+        stderr = getattr(e, "stderr", None) or str(e)
+        raise RuntimeError(f"git {args[0]} failed: {stderr.strip()}") from None
+    return result.stdout
+
+
+def affected_targets(component_name: str, paths: t.Iterable[str]) -> set[str]:
+    """Return the link targets affected by changes to paths.
+
+    Links to a directory depend on the files in it (e.g, its index page), so the
+    directories a path is in are affected too.
+    """
+    targets = set()
+    for path in paths:
+        target = normalize_target(f"{component_name}/{path}")
+        while target and target not in targets:
+            targets.add(target)
+            target = target.rpartition("/")[0]
+    return targets
+
+
+class LinkIndex:
+    """The link targets of each source file of a component, kept between runs.
+
+    Only the forward links are stored, the reverse index is derived from them on load.
+
+    Args:
+        links: The normalized link targets by source file, relative to the component dir.
+    """
+
+    def __init__(self, links: dict[str, list[str]] | None = None):
+        self.links = links or {}
+        self._sources: dict[str, set[str]] | None = None
+
+    def sources_linking_to(self, targets: t.Iterable[str]) -> set[str]:
+        """Return the source files with links into any of targets."""
+        if self._sources is None:
+            self._sources = defaultdict(set)
+            for source, source_targets in self.links.items():
+                for target in source_targets:
+                    self._sources[target].add(source)
+        return {source for target in targets for source in self._sources.get(target, ())}
+
+    def update(self, source: str, links: t.Iterable[str]) -> None:
+        self.links[source] = sorted({normalize_target(link.partition("#")[0]) for link in links})
+        self._sources = None
+
+    def retain(self, sources: t.Iterable[str]) -> None:
+        """Forget the links of source files that are not in sources."""
+        sources = set(sources)
+        self.links = {s: targets for s, targets in self.links.items() if s in sources}
+        self._sources = None
+
+    @classmethod
+    def load(cls, index_file: str) -> t.Optional["LinkIndex"]:
+        try:
+            with open(index_file) as fd:
+                data = json.load(fd)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != LINK_INDEX_VERSION:
+            return None
+        return cls(data["links"])
+
+    def save(self, index_file: str) -> None:
+        index_dir = os.path.dirname(os.path.abspath(index_file))
+        os.makedirs(index_dir, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=index_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as tmp_file:
+            json.dump({"version": LINK_INDEX_VERSION, "links": self.links}, tmp_file)
+        os.replace(tmp_name, index_file)
+
+
+def link_index_file(cache_dir: str, basedir: str) -> str:
+    """Return where the link index of the component at basedir is stored."""
+    key = hashlib.sha256(os.path.abspath(basedir).encode()).hexdigest()[:16]
+    return os.path.join(cache_dir, "linkchecker", f"links-{key}.json")
@@ -1,8 +1,25 @@
 import argparse
+import functools
 import os
+import re
+import sys
+import typing as t
+from concurrent.futures import ProcessPoolExecutor
 from typing import NamedTuple
 
-HEADER_ERROR = "Found {n} broken link(s):"
+from linkchecker.anchors import AnchorIndex, SlugRules
+from linkchecker.changes import LinkIndex, affected_targets, changes_since, link_index_file
+from linkchecker.index import SiteIndex, find_component_dirs
+
+# HEADER_ERROR and report_errors are re-exported, they were defined here before
+from linkchecker.report import HEADER_ERROR, REPORTERS, report_errors  # noqa: F401
+
+if t.TYPE_CHECKING:
+    from mkdocs.config.defaults import MkDocsConfig
+
+
+# The slug rules, or a function to load them the first time a #fragment is checked
+SlugRulesSource = t.Union[SlugRules, t.Callable[[], SlugRules], None]
 
 
 class LinkError(NamedTuple):
@@ -12,22 +29,83 @@ class LinkError(NamedTuple):
     src_lineno: int
 
 
+class FileResult(NamedTuple):
+    filename: str
+    link_errors: list[LinkError]
+    links: list[str]
+
+
 class LinkChecker:
-    def __init__(self, basedir: str):
+    """Check site: links from the component at basedir.
+
+    Args:
+        basedir: The component directory.
+        site_index: An optional index of the whole site. If given, links into any component
+            are checked against it. Otherwise only links into this component are checked.
+        slug_rules: The slugify rules used to check the #fragment of links against the
+            headings of their target, or a function that loads them, which is only called
+            if some link has a #fragment. Defaults to the toc extension defaults.
+    """
+
+    def __init__(
+        self,
+        basedir: str,
+        site_index: SiteIndex | None = None,
+        slug_rules: SlugRulesSource = None,
+    ):
         self._relative_path, self._component_name = os.path.split(basedir)
+        self._site_index = site_index
+        self._slug_rules = slug_rules
+        self._anchor_index: AnchorIndex | None = None
+        # The same targets are linked many times, so they are resolved only once per run
+        self._exists_cache: dict[str, bool] = {}
+        self._markdown_files: dict[str, str | None] = {}
 
     def is_valid(self, link: str) -> bool:
         """Return True if link is valid or should be ignored."""
-        rel_link, _ = self._normalize_link(link)
+        rel_link, fragment = self._normalize_link(link)
         if self._should_skip(rel_link):
             return True
-        abs_link = os.path.join(self._relative_path, rel_link)
-        return file_exists(abs_link)
+        if self._site_index is not None:
+            if rel_link not in self._site_index:
+                return False
+            abs_link = self._site_index.target_path(rel_link)
+        else:
+            abs_link = os.path.join(self._relative_path, rel_link)
+            exists = self._exists_cache.get(abs_link)
+            if exists is None:
+                exists = self._exists_cache[abs_link] = file_exists(abs_link)
+            if not exists:
+                return False
+        if not fragment:
+            return True
+        return self._has_anchor(abs_link, fragment)
+
+    def _has_anchor(self, abs_link: str, fragment: str) -> bool:
+        """Check fragment against the headings of the markdown page abs_link points to.
+
+        Fragments into anything else (e.g, directories without an index) aren't checked.
+        """
+        if abs_link not in self._markdown_files:
+            self._markdown_files[abs_link] = markdown_file(abs_link)
+        target_file = self._markdown_files[abs_link]
+        if target_file is None:
+            return True
+        if self._anchor_index is None:
+            slug_rules = self._slug_rules
+            if callable(slug_rules):
+                slug_rules = slug_rules()
+            self._anchor_index = AnchorIndex(slug_rules)
+        return self._anchor_index.has_anchor(target_file, fragment)
 
     def _should_skip(self, link: str) -> bool:
-        if not link.startswith(f"{self._component_name}/"):
+        component_name = link.partition("/")[0]
+        if self._site_index is not None:
+            if not self._site_index.is_indexed(component_name):
+                return True
+        elif component_name != self._component_name:
             return True
-        if link.strip("/") == f"{self._component_name}/restapi":
+        if link.strip("/") == f"{component_name}/restapi":
             return True
         return False
 
@@ -38,59 +116,181 @@ class LinkChecker:
         return link, query_string
 
 
-def linkchecker(component_rootdir: str, filenames: list[str], verbose: bool = False) -> int:
-    checker = LinkChecker(component_rootdir)
-    cumulative_errors = []
-    for file in filenames:
-        if verbose:
-            print(f"== Checking: {file}")
-        link_errors = check_file(file, checker)
-        if not link_errors:
-            continue
-        cumulative_errors.extend(link_errors)
-    report_errors(link_errors=cumulative_errors, component_rootdir=component_rootdir)
-    if cumulative_errors:
+def linkchecker(
+    component_rootdir: str,
+    filenames: list[str],
+    verbose: bool = False,
+    jobs: int = 1,
+    site_index: SiteIndex | None = None,
+    slug_rules: SlugRulesSource = None,
+    link_index: LinkIndex | None = None,
+    output_format: str = "text",
+    fail_fast: bool = False,
+) -> int:
+    """Check the links of filenames, using up to `jobs` worker processes.
+
+    Errors are reported in output_format as soon as the file they're in is checked.
+    If a link_index is given, it's updated with the links found in filenames, which
+    is only complete if the check wasn't stopped by fail_fast.
+    """
+    reporter = REPORTERS[output_format](component_rootdir)
+    reporter.start()
+    found_errors = False
+    file_results = check_files(component_rootdir, filenames, jobs, site_index, slug_rules)
+    try:
+        for file, link_errors, links in file_results:
+            if verbose:
+                # only the text report is shared with stdout, other formats must stay parsable
+                print(
+                    f"== Checking: {file}",
+                    file=sys.stdout if output_format == "text" else sys.stderr,
+                )
+            if link_index is not None:
+                link_index.update(os.path.relpath(file, component_rootdir), links)
+            if fail_fast:
+                link_errors = link_errors[:1]
+            for link_error in link_errors:
+                reporter.report(link_error)
+            if link_errors:
+                found_errors = True
+                if fail_fast:
+                    break
+    finally:
+        file_results.close()
+    reporter.finish()
+    if found_errors:
         return 1
     return 0
 
 
-def check_file(src_filename: str, checker: LinkChecker) -> list[LinkError]:
+def check_files(
+    component_rootdir: str,
+    filenames: list[str],
+    jobs: int = 1,
+    site_index: SiteIndex | None = None,
+    slug_rules: SlugRulesSource = None,
+) -> t.Generator[FileResult, None, None]:
+    """Yield the link errors of each file, in the same order as filenames.
+
+    Closing the generator early cancels the files that are not being checked yet.
+    """
+    if jobs <= 1 or len(filenames) <= jobs:
+        checker = LinkChecker(component_rootdir, site_index, slug_rules)
+        for file in filenames:
+            yield check_file(file, checker)
+        return
+    # contiguous chunks keep each worker's cache warm for links between nearby files, while
+    # having a few chunks per worker lets results be reported before all files are checked
+    chunk_size = -(-len(filenames) // (jobs * 4))
+    chunks = [filenames[i : i + chunk_size] for i in range(0, len(filenames), chunk_size)]
+    executor = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        results = executor.map(
+            _check_chunk,
+            [component_rootdir] * len(chunks),
+            chunks,
+            [site_index] * len(chunks),
+            [slug_rules] * len(chunks),
+        )
+        for chunk_result in results:
+            yield from chunk_result
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _check_chunk(
+    component_rootdir: str,
+    filenames: list[str],
+    site_index: SiteIndex | None = None,
+    slug_rules: SlugRulesSource = None,
+) -> list[FileResult]:
+    checker = LinkChecker(component_rootdir, site_index, slug_rules)
+    return [check_file(file, checker) for file in filenames]
+
+
+def check_file(src_filename: str, checker: LinkChecker) -> FileResult:
     link_errors = []
+    links = []
     with open(src_filename, "r") as fd:
-        for src_lineno, src_line in enumerate(fd):
-            invalid_links = check_line(src_line, checker)
-            for link_target in invalid_links:
-                link_error = LinkError(
-                    link_target=link_target,
-                    src_line=src_line,
-                    src_filename=src_filename,
-                    src_lineno=src_lineno,
-                )
-                link_errors.append(link_error)
-    return link_errors
-
-
-def check_line(line: str, checker: LinkChecker) -> list[str]:
-    """Return invalid links in line."""
-    return [link for link in extract_links(line) if not checker.is_valid(link)]
-
+        text = fd.read()
+    for src_lineno, pos, link_target in iter_links(text):
+        links.append(link_target)
+        if checker.is_valid(link_target):
+            continue
+        line_start = text.rfind("\n", 0, pos) + 1
+        line_end = text.find("\n", pos)
+        src_line = text[line_start:] if line_end == -1 else text[line_start : line_end + 1]
+        link_error = LinkError(
+            link_target=link_target,
+            src_line=src_line,
+            src_filename=src_filename,
+            src_lineno=src_lineno,
+        )
+        link_errors.append(link_error)
+    return FileResult(filename=src_filename, link_errors=link_errors, links=links)
+
+
+def select_changed_files(
+    component_rootdir: str, filenames: list[str], ref: str, link_index: LinkIndex
+) -> list[str]:
+    """Return the files that changed since ref or link to files that changed since ref.
+
+    Raises:
+        RuntimeError: If the changes can't be inspected with git.
+    """
+    changes = changes_since(component_rootdir, ref)
+    component_name = os.path.basename(component_rootdir)
+    targets = affected_targets(component_name, changes.changed | changes.removed)
+    to_check = changes.changed | link_index.sources_linking_to(targets)
+    return [f for f in filenames if os.path.relpath(f, component_rootdir) in to_check]
+
+
+# Scans markdown for site: links in a single pass, consuming code (where links are just
+# examples) before links can match inside it. Alternatives are tried in order.
+MARKDOWN_SCANNER = re.compile(
+    # fenced code block, up to its closing fence or the end of the document
+    r"(?P<fence>^[ \t]*(?P<fence_chars>`{3,}|~{3,})[\s\S]*?"
+    r"(?:^[ \t]*(?P=fence_chars)[`~]*[ \t]*$|\Z))"
+    # inline code
+    r"|(?P<code>(?P<ticks>`+)[^\n]*?(?P=ticks))"
+    # inline links: [text](site:path)
+    r"|\[[^\]\n]*\]\((?P<inline>site:[^\)\n]*)\)"
+    # reference links: [ref]: site:path
+    r"|\[[^\]\n]*\]:[^\S\n]*(?P<reference>site:\S*)",
+    re.MULTILINE,
+)
+
+
+def iter_links(text: str) -> t.Iterator[tuple[int, int, str]]:
+    """Yield (lineno, position, link) for each site: link in markdown text.
+
+    Links inside fenced code blocks and inline code are ignored. Line numbers start at 0.
+    """
+    lineno, last_pos = 0, 0
+    for match in MARKDOWN_SCANNER.finditer(text):
+        link = match.group("inline") or match.group("reference")
+        if link is None:
+            continue
+        pos = match.start()
+        lineno += text.count("\n", last_pos, pos)
+        last_pos = pos
+        yield lineno, pos, link
 
-def extract_links(line: str) -> list[str]:
-    """Extract site: links from a markdown line."""
-    import re
 
-    links = []
-    # Match inline links: [text](site:path)
-    inline_pattern = r"\[([^\]]*)\]\((site:[^\)]*)\)"
-    # Match reference links: [ref]: site:path
-    reference_pattern = r"\[[^\]]*\]:\s*(site:[^\s]*)"
+def extract_links(text: str) -> list[str]:
+    """Extract site: links from markdown text."""
+    return [link for _, _, link in iter_links(text)]
 
-    for match in re.finditer(inline_pattern, line):
-        links.append(match.group(2))
-    for match in re.finditer(reference_pattern, line):
-        links.append(match.group(1))
 
-    return links
+def markdown_file(file: str) -> str | None:
+    """Return the markdown file rendered at the page file points to, if any."""
+    file = os.path.realpath(file)
+    if file.endswith(".md") and os.path.isfile(file):
+        return file
+    for candidate in (file + ".md", os.path.join(file, "index.md")):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
 
 
 def file_exists(file: str) -> bool:
@@ -104,17 +304,6 @@ def file_exists(file: str) -> bool:
     return False
 
 
-def report_errors(link_errors: list[LinkError], component_rootdir: str):
-    """Print link errors to stdout."""
-    if not link_errors:
-        return
-    print(HEADER_ERROR.format(n=len(link_errors)))
-    for error in link_errors:
-        filename = os.path.relpath(error.src_filename, component_rootdir)
-        lineno = error.src_lineno + 1
-        print(f"{filename}:{lineno}  {error.link_target}")
-
-
 def parse_arguments():
     """Parse command line arguments."""
 
@@ -130,6 +319,63 @@ def parse_arguments():
         action="store_true",
         help="Print each file as it is being checked",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of worker processes used to check files (default: 1)",
+    )
+    parser.add_argument(
+        "--site",
+        action="store_true",
+        help="Also check links into other components, using an index of the whole site",
+    )
+    parser.add_argument(
+        "--config-file",
+        default=None,
+        help=(
+            "The mkdocs.yml of the site, for its slugify rules and, with --site, its "
+            "components (default: the pulp-docs one)"
+        ),
+    )
+    parser.add_argument(
+        "--path",
+        default=None,
+        help=(
+            "A colon separated list of lookup paths for the site components in the form "
+            "[repo1@]path1 [:[repo2@]path2 [...]] (default: the parent of basedir)"
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory where indexes are kept between runs (default: ~/.cache/pulp-docs)",
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        default=None,
+        help=(
+            "Only check files changed since the git REF and files linking to changed files. "
+            "The first run checks all files to build the index of their links."
+        ),
+    )
+    parser.add_argument(
+        "--format",
+        choices=list(REPORTERS),
+        default="text",
+        help=(
+            "Output format (default: text). All formats but text stream each error as soon as "
+            "it's found: json as one object per line, sarif as a SARIF log and github as "
+            "GitHub Actions annotations"
+        ),
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Stop at the first broken link",
+    )
     parser.add_argument("files", nargs="+", help="Markdown files to check")
     args = parser.parse_args()
 
@@ -137,6 +383,7 @@ def parse_arguments():
     basedir = os.path.expanduser(args.basedir)
     basedir = os.path.expandvars(basedir)
     basedir = os.path.abspath(basedir)
+    args.basedir = basedir
 
     if not os.path.exists(basedir):
         parser.error(f"basedir does not exist: {basedir}")
@@ -149,13 +396,108 @@ def parse_arguments():
         if os.path.isdir(f):
             parser.error(f"expected a file but got a directory: {f}")
 
-    return basedir, args.files, args.verbose
+    if args.jobs < 1:
+        parser.error(f"jobs must be a positive number: {args.jobs}")
+
+    return args
+
+
+def load_mkdocs_config(config_file: str | None = None) -> "MkDocsConfig":
+    """Load config_file, or the mkdocs.yml shipped with pulp-docs."""
+    from mkdocs.config import load_config
+
+    from pulp_docs.cli import get_default_mkdocs
+
+    return load_config(config_file or str(get_default_mkdocs()))
+
+
+def load_slug_rules(config_file: str | None = None) -> SlugRules:
+    """Read the slug rules from config_file, or from the mkdocs.yml shipped with pulp-docs.
+
+    Only the markdown_extensions are read, as loading the whole config loads every
+    mkdocs plugin, which is too slow for checking a few files.
+    """
+    from mkdocs.utils.yaml import yaml_load
+
+    from pulp_docs.cli import get_default_mkdocs
+
+    with open(config_file or str(get_default_mkdocs())) as fd:
+        extensions = yaml_load(fd).get("markdown_extensions") or []
+    if isinstance(extensions, dict):
+        extensions = [extensions]
+    mdx_configs = {}
+    for extension in extensions:
+        if isinstance(extension, dict):
+            mdx_configs.update({name: config or {} for name, config in extension.items()})
+    return SlugRules.from_mdx_configs(mdx_configs)
+
+
+def load_site(
+    basedir: str,
+    config: "MkDocsConfig",
+    path: str | None = None,
+    cache_dir: str | None = None,
+) -> SiteIndex:
+    """Load the index of the site basedir is part of.
+
+    The index is reused from previous runs, except for components that changed.
+    """
+    lookup_paths = path.split(":") if path else [os.path.dirname(basedir)]
+    index_file = os.path.join(resolve_cache_dir(cache_dir), "linkchecker", "site-index.json")
+    component_dirs = find_component_dirs(config, lookup_paths)
+    return SiteIndex.build(component_dirs, index_file, site_docs_dir=config.docs_dir)
+
+
+def resolve_cache_dir(cache_dir: str | None) -> str:
+    if cache_dir:
+        return cache_dir
+    from pulp_docs.plugin import default_cache_dir
+
+    return str(default_cache_dir())
 
 
 def main():
     """CLI entry point for the linkchecker command."""
-    basedir, files, verbose = parse_arguments()
-    exit(linkchecker(basedir, files, verbose))
+    args = parse_arguments()
+    # anchors are slugified as configured for the site, with or without --site
+    slug_rules = functools.partial(load_slug_rules, args.config_file)
+    site_index = None
+    if args.site:
+        config = load_mkdocs_config(args.config_file)
+        site_index = load_site(args.basedir, config, args.path, args.cache_dir)
+
+    files = args.files
+    link_index, link_index_path = None, None
+    if args.changed_since:
+        link_index_path = link_index_file(resolve_cache_dir(args.cache_dir), args.basedir)
+        link_index = LinkIndex.load(link_index_path)
+        try:
+            if link_index is not None:
+                files = select_changed_files(args.basedir, files, args.changed_since, link_index)
+            else:
+                changes_since(args.basedir, args.changed_since)  # fail early on bad refs
+                link_index = LinkIndex()
+        except RuntimeError as e:
+            print(f"error: {e}", file=sys.stderr)
+            exit(2)
+
+    exit_code = linkchecker(
+        args.basedir,
+        files,
+        args.verbose,
+        args.jobs,
+        site_index,
+        slug_rules,
+        link_index,
+        output_format=args.format,
+        fail_fast=args.fail_fast,
+    )
+    # a fail-fast run stops before indexing every file, keep the last complete index instead
+    stopped_early = args.fail_fast and exit_code != 0
+    if link_index is not None and link_index_path and not stopped_early:
+        link_index.retain(os.path.relpath(f, args.basedir) for f in args.files)
+        link_index.save(link_index_path)
+    exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,204 @@
+import json
+import os
+import posixpath
+import tempfile
+import typing as t
+
+if t.TYPE_CHECKING:
+    from mkdocs.config.defaults import MkDocsConfig
+
+# Directories of a component that hold its docs, as linked by site: links
+DOCS_DIRNAMES = ("docs", "staging_docs")
+INDEX_VERSION = 1
+# Key of the site's own pages (e.g, 'help/', 'blog/') in the persisted index
+SITE_ROOT = ""
+
+
+class ComponentIndex(t.NamedTuple):
+    """The link targets of a single component and what is needed to validate them."""
+
+    component_dir: str
+    dir_mtimes: dict[str, int]
+    targets: list[str]
+
+
+class SiteIndex:
+    """Index of every link target of the site, across all components.
+
+    Targets are keyed as site: links are written, relative to the parent of their
+    component directory (e.g. 'pulpcore/docs/admin/guides/foo'), without the '.md'
+    suffix. Links into components that couldn't be found locally are not checked.
+    The pages of the site itself are keyed relative to its docs_dir (e.g. 'help/more').
+
+    Args:
+        components: The indexed components by component name.
+        missing: Names of components that are part of the site but weren't found.
+        site_root: The index of the pages in the docs_dir of the site, if any.
+    """
+
+    def __init__(
+        self,
+        components: dict[str, ComponentIndex],
+        missing: t.Iterable[str] = (),
+        site_root: ComponentIndex | None = None,
+    ):
+        self.components = components
+        self.missing = frozenset(missing)
+        self.site_root = site_root
+        indexes = [*components.values(), *([site_root] if site_root else [])]
+        self._targets = frozenset(target for index in indexes for target in index.targets)
+
+    def __contains__(self, link: str) -> bool:
+        return normalize_target(link) in self._targets
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def is_indexed(self, component_name: str) -> bool:
+        return component_name not in self.missing
+
+    def target_path(self, link: str) -> str:
+        """Return the path of the file or directory an indexed link points to."""
+        target = normalize_target(link)
+        component_name, _, relpath = target.partition("/")
+        if component_name not in self.components and self.site_root:
+            return os.path.join(self.site_root.component_dir, target)
+        component_dir = self.components[component_name].component_dir
+        if relpath == "changes":
+            return os.path.join(component_dir, "CHANGES.md")
+        if not relpath:
+            return os.path.join(component_dir, "docs", "index.md")
+        return os.path.join(component_dir, relpath)
+
+    @classmethod
+    def build(
+        cls,
+        component_dirs: dict[str, str | None],
+        index_file: str | None = None,
+        site_docs_dir: str | None = None,
+    ) -> "SiteIndex":
+        """Index the docs of each component, reusing the up-to-date parts of index_file.
+
+        A component index is up-to-date if the mtimes of its directories didn't change,
+        as adding, removing or renaming a file changes the mtime of its parent directory.
+        The component directory itself is tracked too, to notice new docs directories.
+
+        Args:
+            component_dirs: Component directories by component name, None if not found.
+            index_file: Optional file where the index is persisted between runs.
+            site_docs_dir: Optional docs_dir of the site, whose own pages are indexed too.
+        """
+        cached = _load_components(index_file) if index_file else {}
+        components = {}
+        stale = False
+        for name, component_dir in component_dirs.items():
+            if component_dir is None:
+                continue
+            component = cached.get(name)
+            if component is None or not _is_fresh(component, component_dir):
+                component = index_component(component_dir)
+                stale = True
+            components[name] = component
+        site_root = cached.get(SITE_ROOT)
+        if site_docs_dir is None:
+            site_root = None
+        elif site_root is None or not _is_fresh(site_root, site_docs_dir):
+            site_root = index_site_root(site_docs_dir)
+            stale = True
+        persisted = {**components, **({SITE_ROOT: site_root} if site_root else {})}
+        if index_file and (stale or persisted.keys() != cached.keys()):
+            _save_components(index_file, persisted)
+        missing = [name for name, component_dir in component_dirs.items() if not component_dir]
+        return cls(components, missing, site_root)
+
+
+def index_component(component_dir: str) -> ComponentIndex:
+    """Walk the docs of a component, recording its link targets and directory mtimes."""
+    component_dir = os.path.abspath(component_dir)
+    parent_dir = os.path.dirname(component_dir)
+    component_name = os.path.basename(component_dir)
+    dir_mtimes = {component_dir: os.stat(component_dir).st_mtime_ns}
+    targets = [component_name]
+    if os.path.exists(os.path.join(component_dir, "CHANGES.md")):
+        targets.append(f"{component_name}/changes")
+    for docs_dirname in DOCS_DIRNAMES:
+        docs_dir = os.path.join(component_dir, docs_dirname)
+        for dirpath, dirnames, filenames in os.walk(docs_dir, followlinks=True):
+            dir_mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+            for name in [dirpath, *(os.path.join(dirpath, f) for f in filenames)]:
+                relpath = os.path.relpath(name, parent_dir).replace(os.sep, "/")
+                targets.append(normalize_target(relpath))
+    return ComponentIndex(component_dir=component_dir, dir_mtimes=dir_mtimes, targets=targets)
+
+
+def index_site_root(docs_dir: str) -> ComponentIndex:
+    """Walk the docs_dir of the site, recording its link targets and directory mtimes."""
+    docs_dir = os.path.abspath(docs_dir)
+    dir_mtimes = {}
+    targets = []
+    for dirpath, dirnames, filenames in os.walk(docs_dir, followlinks=True):
+        dir_mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+        for name in [dirpath, *(os.path.join(dirpath, f) for f in filenames)]:
+            if name != docs_dir:
+                relpath = os.path.relpath(name, docs_dir).replace(os.sep, "/")
+                targets.append(normalize_target(relpath))
+    return ComponentIndex(component_dir=docs_dir, dir_mtimes=dir_mtimes, targets=targets)
+
+
+def normalize_target(link: str) -> str:
+    """Normalize a site: link (without fragment) or a file path into an index key."""
+    link = posixpath.normpath(link.removeprefix("site:").strip().strip("/"))
+    return link.removesuffix(".md")
+
+
+def _is_fresh(component: ComponentIndex, component_dir: str) -> bool:
+    if component.component_dir != os.path.abspath(component_dir):
+        return False
+    for dirpath, mtime in component.dir_mtimes.items():
+        try:
+            if os.stat(dirpath).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def _load_components(index_file: str) -> dict[str, ComponentIndex]:
+    try:
+        with open(index_file) as fd:
+            data = json.load(fd)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != INDEX_VERSION:
+        return {}
+    return {name: ComponentIndex(**component) for name, component in data["components"].items()}
+
+
+def _save_components(index_file: str, components: dict[str, ComponentIndex]) -> None:
+    data = {
+        "version": INDEX_VERSION,
+        "components": {name: component._asdict() for name, component in components.items()},
+    }
+    index_dir = os.path.dirname(os.path.abspath(index_file))
+    os.makedirs(index_dir, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=index_dir, suffix=".tmp")
+    with os.fdopen(fd, "w") as tmp_file:
+        json.dump(data, tmp_file)
+    os.replace(tmp_name, index_file)
+
+
+def find_component_dirs(config: "MkDocsConfig", lookup_paths: list[str]) -> dict[str, str | None]:
+    """Return the directory of each component of the site, None if it wasn't found.
+
+    Components are read from the PulpDocs plugin config and located with the same lookup
+    paths used to build the site.
+    """
+    from pulp_docs.plugin import ComponentLoader
+
+    loader = ComponentLoader.from_plugin(config.plugins["PulpDocs"], lookup_paths)
+    component_dirs: dict[str, str | None] = {}
+    for spec in loader.component_specs:
+        repo_dir = loader.repository_finder.find(spec.repository_name)
+        component_dir = repo_dir.parent / spec.path if repo_dir else None
+        component_dirs[spec.component_name] = str(component_dir) if component_dir else None
+    return component_dirs
@@ -0,0 +1,142 @@
+import json
+import os
+import typing as t
+
+if t.TYPE_CHECKING:
+    from linkchecker.cli import LinkError
+
+HEADER_ERROR = "Found {n} broken link(s):"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_RULE_ID = "broken-link"
+
+
+class Reporter:
+    """Report link errors as they are found.
+
+    Args:
+        component_rootdir: The component directory, which paths are shown relative to.
+    """
+
+    def __init__(self, component_rootdir: str):
+        self.component_rootdir = component_rootdir
+
+    def start(self) -> None:
+        pass
+
+    def report(self, error: "LinkError") -> None:
+        raise NotImplementedError
+
+    def finish(self) -> None:
+        pass
+
+    def _emit(self, line: str) -> None:
+        print(line, flush=True)
+
+
+class TextReporter(Reporter):
+    """The human readable report, printed at the end as it starts with the error count."""
+
+    def __init__(self, component_rootdir: str):
+        super().__init__(component_rootdir)
+        self.link_errors: list["LinkError"] = []
+
+    def report(self, error: "LinkError") -> None:
+        self.link_errors.append(error)
+
+    def finish(self) -> None:
+        report_errors(self.link_errors, self.component_rootdir)
+
+
+class JsonReporter(Reporter):
+    """One JSON object per error, per line."""
+
+    def report(self, error: "LinkError") -> None:
+        record = {
+            "file": os.path.relpath(error.src_filename, self.component_rootdir),
+            "line": error.src_lineno + 1,
+            "link": error.link_target,
+            "text": error.src_line.rstrip("\n"),
+        }
+        self._emit(json.dumps(record))
+
+
+class SarifReporter(Reporter):
+    """A SARIF log, streamed with one result per line.
+
+    Locations are relative to the working directory, which is expected to be the root of
+    the repository being checked.
+    """
+
+    def __init__(self, component_rootdir: str):
+        super().__init__(component_rootdir)
+        self._separator = ""
+
+    def start(self) -> None:
+        rule = {
+            "id": SARIF_RULE_ID,
+            "shortDescription": {"text": "Broken site: link"},
+        }
+        tool = {"driver": {"name": "pulp-linkchecker", "rules": [rule]}}
+        # open the document up to the results list, which is closed by finish()
+        header = {"$schema": SARIF_SCHEMA, "version": "2.1.0", "runs": [{"tool": tool}]}
+        self._emit(json.dumps(header)[:-3] + ', "results": [')
+
+    def report(self, error: "LinkError") -> None:
+        location = {
+            "physicalLocation": {
+                "artifactLocation": {"uri": _relative_uri(error.src_filename)},
+                "region": {"startLine": error.src_lineno + 1},
+            }
+        }
+        result = {
+            "ruleId": SARIF_RULE_ID,
+            "level": "error",
+            "message": {"text": f"Broken link: {error.link_target}"},
+            "locations": [location],
+        }
+        self._emit(self._separator + json.dumps(result))
+        self._separator = ","
+
+    def finish(self) -> None:
+        self._emit("]}]}")
+
+
+class GithubReporter(Reporter):
+    """GitHub Actions workflow commands, which annotate the errors in the PR diff."""
+
+    def report(self, error: "LinkError") -> None:
+        file = _escape_property(_relative_uri(error.src_filename))
+        title = _escape_property("Broken link")
+        message = _escape_data(error.link_target)
+        self._emit(f"::error file={file},line={error.src_lineno + 1},title={title}::{message}")
+
+
+REPORTERS: dict[str, type[Reporter]] = {
+    "text": TextReporter,
+    "json": JsonReporter,
+    "sarif": SarifReporter,
+    "github": GithubReporter,
+}
+
+
+def report_errors(link_errors: list["LinkError"], component_rootdir: str):
+    """Print link errors to stdout."""
+    if not link_errors:
+        return
+    print(HEADER_ERROR.format(n=len(link_errors)))
+    for error in link_errors:
+        filename = os.path.relpath(error.src_filename, component_rootdir)
+        lineno = error.src_lineno + 1
+        print(f"{filename}:{lineno}  {error.link_target}")
+
+
+def _relative_uri(filename: str) -> str:
+    return os.path.relpath(filename).replace(os.sep, "/")
+
+
+def _escape_data(value: str) -> str:
+    return value.replace("%", "%25").replace("\r", "%0D").replace("\n", "%0A")
+
+
+def _escape_property(value: str) -> str:
+    return _escape_data(value).replace(":", "%3A").replace(",", "%2C")
@@ -1,4 +1,8 @@
 import asyncio
+import fcntl
+import hashlib
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from importlib import resources
 from pathlib import Path
 
@@ -6,7 +10,19 @@ import click
 import git
 from mkdocs.__main__ import cli as mkdocs_cli
 
-from pulp_docs.context import ctx_blog, ctx_docstrings, ctx_draft, ctx_dryrun, ctx_openapi, ctx_path
+from pulp_docs.context import (
+    ctx_blog,
+    ctx_cache_dir,
+    ctx_docstrings,
+    ctx_draft,
+    ctx_dryrun,
+    ctx_git_dirty_check,
+    ctx_openapi,
+    ctx_openapi_jobs,
+    ctx_openapi_shared_env,
+    ctx_path,
+    ctx_profile_build,
+)
 from pulp_docs.plugin import ComponentLoader, ComponentSpec, default_lookup_paths
 
 
@@ -30,28 +46,184 @@ def dryrun_callback(ctx: click.Context, param: click.Parameter, value: bool) ->
     return value
 
 
+def cache_dir_callback(ctx: click.Context, param: click.Parameter, value: str | None) -> str:
+    if value:
+        ctx_cache_dir.set(Path(value))
+    return value
+
+
+def git_dirty_check_callback(ctx: click.Context, param: click.Parameter, value: bool) -> bool:
+    ctx_git_dirty_check.set(value)
+    return value
+
+
+def profile_build_callback(
+    ctx: click.Context, param: click.Parameter, value: str | None
+) -> str | None:
+    if value:
+        ctx_profile_build.set(Path(value))
+    return value
+
+
 def find_path_callback(ctx: click.Context, param: click.Parameter, value: str) -> bool:
     result = [item.strip() for item in value.split(":") if item.strip()]
     ctx_path.set(result)
     return result
 
 
-async def clone_repositories(repositories: set[str], dest_dir: Path) -> None:
-    """Clone multiple repositories concurrently."""
+FETCH_JOBS = 8
+
+# Cone mode checks out the files at the top of each parent dir too (e.g, CHANGES.md,
+# pyproject.toml and template_config.yml), so only the docs dirs need to be listed.
+SPARSE_DOCS_DIRS = ("docs", "staging_docs")
+
+
+def sparse_checkout_dirs(specs: list[ComponentSpec]) -> dict[str, list[str]]:
+    """Return the dirs a docs build needs from each repository, by git url."""
+    dirs: dict[str, list[str]] = {}
+    for spec in specs:
+        component_subdir = spec.path.partition("/")[2]
+        for docs_dir in SPARSE_DOCS_DIRS:
+            sparse_dir = f"{component_subdir}/{docs_dir}" if component_subdir else docs_dir
+            dirs.setdefault(spec.git_url, []).append(sparse_dir)
+    return dirs
+
+
+def update_repository(repo_path: Path) -> str:
+    """Move a checkout to the tip of its branch, returning what moved.
+
+    Checkouts with local changes, not on a branch, or with commits that were not pushed are
+    left alone.
+    """
+    repo = git.Repo(repo_path)
+    if repo.head.is_detached:
+        return "skipped, not on a branch"
+    if repo.is_dirty():
+        return "skipped, has local changes"
+    branch = repo.active_branch
+    tracking_branch = branch.tracking_branch()
+    remote_branch = tracking_branch.remote_head if tracking_branch else branch.name
+    old_revision = repo.head.commit.hexsha
+    # checked before fetching, which moves the remote-tracking branch
+    is_pushed = old_revision == _rev_parse(repo, f"refs/remotes/origin/{remote_branch}")
+    # clones that borrow objects from a mirror are not shallow, and don't need to be
+    is_shallow = repo.git.rev_parse("--is-shallow-repository") == "true"
+    repo.git.fetch(*(["--depth=1"] if is_shallow else []), "origin", remote_branch)
+    new_revision = repo.git.rev_parse("FETCH_HEAD")
+    if new_revision == old_revision:
+        return f"up to date at {old_revision[:7]}"
+    if not is_pushed and not repo.is_ancestor(old_revision, new_revision):
+        return "skipped, has commits that are not on the remote branch"
+    # Shallow histories don't connect, so the branch can't be merged: it's moved instead
+    repo.git.reset("--keep", new_revision)
+    return f"updated {old_revision[:7]}..{new_revision[:7]}"
+
+
+def _rev_parse(repo: git.Repo, ref: str) -> str | None:
+    try:
+        return repo.git.rev_parse("--verify", "--quiet", ref)
+    except git.GitCommandError:
+        return None
+
+
+def update_mirror(repo_url: str, mirror_cache: Path) -> Path:
+    """Create or update the bare mirror of repo_url in mirror_cache, returning its path.
+
+    Mirrors are locked while they are written, so jobs on the same host can share them.
+    """
+    repo_name = repo_url.rstrip("/").split("/")[-1].removesuffix(".git")
+    url_hash = hashlib.sha256(repo_url.encode()).hexdigest()[:12]
+    mirror_path = mirror_cache / f"{repo_name}-{url_hash}.git"
+    mirror_cache.mkdir(parents=True, exist_ok=True)
+    with open(mirror_path.with_suffix(".lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        if not mirror_path.exists():
+            tmp_path = mirror_path.with_suffix(".tmp")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            mirror = git.Repo.clone_from(repo_url, tmp_path, bare=True)
+            # branches and tags only, e.g, GitHub's refs/pull/* would be too much
+            mirror.git.config("remote.origin.fetch", "+refs/heads/*:refs/heads/*")
+            mirror.git.config("--add", "remote.origin.fetch", "+refs/tags/*:refs/tags/*")
+            tmp_path.rename(mirror_path)
+        else:
+            git.Repo(mirror_path).git.fetch("--prune", "origin")
+    return mirror_path
+
+
+async def clone_repositories(
+    repositories: set[str],
+    dest_dir: Path,
+    sparse_dirs: dict[str, list[str]] | None = None,
+    update: bool = False,
+    jobs: int = FETCH_JOBS,
+    mirror_cache: Path | None = None,
+) -> dict[str, str]:
+    """Clone multiple repositories concurrently.
+
+    Args:
+        repositories: The git urls to clone.
+        dest_dir: The directory where repositories are cloned into.
+        sparse_dirs: The dirs to check out by git url. Repositories listed here are cloned
+            without blobs, which are only fetched for the checked out dirs.
+        update: Whether repositories that were already cloned are updated.
+        jobs: How many repositories are cloned or updated at the same time.
+        mirror_cache: A dir with bare mirrors of the repositories, which are updated and
+            then used as --reference, so new clones borrow objects instead of fetching them.
+
+    Returns:
+        What was done to each repository, by repository name.
+    """
+    sparse_dirs = sparse_dirs or {}
+    executor = ThreadPoolExecutor(max_workers=jobs)
+
+    def clone(repo_url: str, repo_path: Path) -> None:
+        if mirror_cache:
+            # objects are borrowed from the mirror, so shallow or blobless clones save nothing
+            clone_options = {"reference": update_mirror(repo_url, mirror_cache)}
+        elif repo_url in sparse_dirs:
+            clone_options = {"depth": 1, "filter": "blob:none"}
+        else:
+            clone_options = {"depth": 1}
+        if repo_url not in sparse_dirs:
+            git.Repo.clone_from(repo_url, repo_path, **clone_options)
+            return
+        repo = git.Repo.clone_from(repo_url, repo_path, sparse=True, **clone_options)
+        repo.git.sparse_checkout("set", *sparse_dirs[repo_url])
+
+    def update_checkout(repo_url: str, repo_path: Path) -> str:
+        if mirror_cache:
+            update_mirror(repo_url, mirror_cache)
+        return update_repository(repo_path)
 
-    async def clone_repository(repo_url: str) -> None:
+    async def clone_repository(repo_url: str) -> tuple[str, str]:
         repo_name = repo_url.split("/")[-1]
         repo_path = dest_dir / repo_name
-        if repo_path.exists():
-            click.echo(f"Repository {repo_name} already exists at {repo_path}, skipping.")
-            return
-        click.echo(f"Cloning {repo_url} to {repo_path}...")
         loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, lambda: git.Repo.clone_from(repo_url, repo_path, depth=1))
+        if repo_path.exists():
+            if not update:
+                click.echo(f"Repository {repo_name} already exists at {repo_path}, skipping.")
+                return repo_name, "skipped, already exists"
+            click.echo(f"Updating {repo_name} at {repo_path}...")
+            try:
+                return repo_name, await loop.run_in_executor(
+                    executor, update_checkout, repo_url, repo_path
+                )
+            except git.GitError as e:
+                return repo_name, f"failed: {e}"
+        mode = "sparse " if repo_url in sparse_dirs else ""
+        click.echo(f"Cloning {repo_url} to {repo_path} ({mode}checkout)...")
+        await loop.run_in_executor(executor, clone, repo_url, repo_path)
         click.echo(f"Successfully cloned {repo_name}")
+        return repo_name, "cloned"
 
-    tasks = [clone_repository(repo) for repo in repositories]
-    await asyncio.gather(*tasks)
+    with executor:
+        tasks = [clone_repository(repo) for repo in repositories]
+        summary = dict(sorted(await asyncio.gather(*tasks)))
+    if update:
+        click.echo("Summary:")
+        for repo_name, status in summary.items():
+            click.echo(f"  {repo_name}: {status}")
+    return summary
 
 
 blog_option = click.option(
@@ -85,6 +257,37 @@ path_option = click.option(
     help="A colon separated list of lookup paths in the form:[repo1@]path1 [:[repo2@]path2 [...]].",
 )
 
+cache_dir_option = click.option(
+    "--cache-dir",
+    envvar="PULPDOCS_CACHE_DIR",
+    expose_value=False,
+    default=None,
+    type=click.Path(file_okay=False),
+    callback=cache_dir_callback,
+    help="Directory for persistent build caches (default: ~/.cache/pulp-docs).",
+)
+
+git_dirty_check_option = click.option(
+    "--git-dirty-check/--no-git-dirty-check",
+    envvar="PULPDOCS_GIT_DIRTY_CHECK",
+    expose_value=False,
+    default=True,
+    callback=git_dirty_check_callback,
+    help=(
+        "Check repositories for uncommitted changes. Disable it on CI to speed up startup. "
+        "Openapi specs are not cached when it is disabled."
+    ),
+)
+
+profile_build_option = click.option(
+    "--profile-build",
+    expose_value=False,
+    default=None,
+    type=click.Path(dir_okay=False),
+    callback=profile_build_callback,
+    help="Write wall time and peak memory of each build phase to a Chrome trace file.",
+)
+
 dryrun_option = click.option(
     "--dry-run/--no-dry-run",
     expose_value=False,
@@ -99,6 +302,16 @@ def openapi_callback(ctx: click.Context, param: click.Parameter, value: bool) ->
     return value
 
 
+def openapi_jobs_callback(ctx: click.Context, param: click.Parameter, value: int) -> int:
+    ctx_openapi_jobs.set(value)
+    return value
+
+
+def openapi_shared_env_callback(ctx: click.Context, param: click.Parameter, value: bool) -> bool:
+    ctx_openapi_shared_env.set(value)
+    return value
+
+
 openapi_option = click.option(
     "--openapi/--no-openapi",
     expose_value=False,
@@ -107,12 +320,35 @@ openapi_option = click.option(
     help="Generate OpenAPI specs.",
 )
 
+openapi_jobs_option = click.option(
+    "--openapi-jobs",
+    envvar="PULPDOCS_OPENAPI_JOBS",
+    expose_value=False,
+    default=1,
+    type=click.IntRange(min=1),
+    callback=openapi_jobs_callback,
+    help="Number of OpenAPI specs generated concurrently.",
+)
+
+openapi_shared_env_option = click.option(
+    "--openapi-shared-env/--no-openapi-shared-env",
+    expose_value=False,
+    default=False,
+    callback=openapi_shared_env_callback,
+    help="Generate all OpenAPI specs from a single environment with all plugins installed.",
+)
+
 
 def fetch_repositories(
     dest: Path,
     config_file: Path | None = None,
     component_filter: list[str] | None = None,
     fetch_all: bool = False,
+    sparse: bool = False,
+    full_checkout: list[str] | None = None,
+    update: bool = False,
+    jobs: int = FETCH_JOBS,
+    mirror_cache: Path | None = None,
 ) -> list[ComponentSpec]:
     """Fetch missing repositories and return component specs.
 
@@ -121,6 +357,12 @@ def fetch_repositories(
         config_file: Path to mkdocs.yml config file (defaults to bundled config)
         component_filter: Optional list of component names to fetch (fetches all if None)
         fetch_all: If True, fetch all components from all_specs (not just missing)
+        sparse: If True, clone only the files docs builds read (partial and sparse clones)
+        full_checkout: Component names whose repositories are fully checked out even if
+            sparse is True, e.g, to generate their OpenAPI specs or docstrings
+        update: If True, also update the repositories already cloned into dest
+        jobs: How many repositories are fetched at the same time
+        mirror_cache: A dir where bare mirrors of the repositories are kept between runs
 
     Returns:
         List of ComponentSpec objects for the fetched/available components
@@ -133,7 +375,7 @@ def fetch_repositories(
     load_result = component_loader.load_all()
 
     # Determine which components to fetch
-    if fetch_all:
+    if fetch_all or update:
         to_fetch = load_result.all_specs
     else:
         to_fetch = load_result.missing
@@ -142,10 +384,25 @@ def fetch_repositories(
         to_fetch = [c for c in to_fetch if c.component_name in component_filter]
 
     repos_to_fetch = {comp.git_url for comp in to_fetch}
+    sparse_dirs = {}
+    if sparse:
+        sparse_dirs = sparse_checkout_dirs(load_result.all_specs)
+        for comp in load_result.all_specs:
+            if comp.component_name in (full_checkout or []):
+                sparse_dirs.pop(comp.git_url, None)
 
     if repos_to_fetch:
         dest.mkdir(parents=True, exist_ok=True)
-        asyncio.run(clone_repositories(repos_to_fetch, dest))
+        asyncio.run(
+            clone_repositories(
+                repos_to_fetch,
+                dest,
+                sparse_dirs=sparse_dirs,
+                update=update,
+                jobs=jobs,
+                mirror_cache=mirror_cache,
+            )
+        )
 
     # Return specs for requested components
     specs = load_result.all_specs
@@ -184,10 +441,63 @@ def fetch_repositories(
     default=False,
     help="Fetch all components, not just missing ones.",
 )
-def fetch(dest, config_file, path_exclude, fetch_all):
+@click.option(
+    "--sparse/--no-sparse",
+    default=False,
+    help=(
+        "Clone without blobs and check out only the docs, CHANGES.md, pyproject.toml and "
+        "template_config.yml of each component."
+    ),
+)
+@click.option(
+    "--full-checkout",
+    multiple=True,
+    metavar="COMPONENT",
+    help=(
+        "Check out the whole repository of COMPONENT with --sparse, e.g, when its sources "
+        "are needed for the OpenAPI specs or docstrings. Can be repeated."
+    ),
+)
+@click.option(
+    "--update/--no-update",
+    default=False,
+    help=(
+        "Update the repositories already in the destination dir to the tip of their branch, "
+        "instead of skipping them. Checkouts with local changes are left alone."
+    ),
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=FETCH_JOBS,
+    show_default=True,
+    help="How many repositories are fetched at the same time.",
+)
+@click.option(
+    "--mirror-cache",
+    type=click.Path(file_okay=False),
+    envvar="PULPDOCS_MIRROR_CACHE",
+    help=(
+        "Directory with bare mirrors of the repositories, kept up to date and shared by the "
+        "clones, so fetches on the same host only download new objects."
+    ),
+)
+def fetch(
+    dest, config_file, path_exclude, fetch_all, sparse, full_checkout, update, jobs, mirror_cache
+):
     """Fetch repositories to destination dir."""
     dest_path = Path(dest)
-    fetch_repositories(dest_path, config_file, fetch_all=fetch_all)
+    fetch_repositories(
+        dest_path,
+        config_file,
+        fetch_all=fetch_all,
+        sparse=sparse,
+        full_checkout=list(full_checkout),
+        update=update,
+        jobs=jobs,
+        mirror_cache=Path(mirror_cache) if mirror_cache else None,
+    )
 
 
 main = mkdocs_cli
@@ -220,6 +530,11 @@ for command_name in ["build", "serve"]:
     blog_option(sub_command)
     docstrings_option(sub_command)
     path_option(sub_command)
+    cache_dir_option(sub_command)
+    git_dirty_check_option(sub_command)
+    profile_build_option(sub_command)
+    openapi_jobs_option(sub_command)
+    openapi_shared_env_option(sub_command)
     dryrun_option(sub_command)
     serve_options = sub_command.params
     config_file_opt = next(filter(lambda opt: opt.name == "config_file", serve_options))
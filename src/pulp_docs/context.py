@@ -6,3 +6,8 @@ ctx_draft = ContextVar("ctx_draft", default=False)
 ctx_path = ContextVar("ctx_path", default=None)
 ctx_dryrun = ContextVar("ctx_dryrun", default=False)
 ctx_openapi = ContextVar("ctx_openapi", default=True)
+ctx_openapi_jobs = ContextVar("ctx_openapi_jobs", default=1)
+ctx_openapi_shared_env = ContextVar("ctx_openapi_shared_env", default=False)
+ctx_cache_dir = ContextVar("ctx_cache_dir", default=None)
+ctx_git_dirty_check = ContextVar("ctx_git_dirty_check", default=True)
+ctx_profile_build = ContextVar("ctx_profile_build", default=None)
@@ -0,0 +1,99 @@
+"""
+Module for reading git HEAD information straight from the repository files.
+
+Querying GitPython for the head commit spawns git subprocesses, which is slow on some
+environments (e.g, containers). Reading HEAD, loose refs and packed-refs is enough for
+the common cases, and callers should fall back to GitPython when this returns None.
+"""
+
+import re
+from pathlib import Path
+from typing import NamedTuple
+
+SHA_PATTERN = re.compile(r"^([0-9a-f]{40}|[0-9a-f]{64})$")
+MAX_SYMREF_DEPTH = 5
+
+
+class GitHead(NamedTuple):
+    revision: str
+    branch: str | None
+
+
+def read_git_head(repo_dir: Path) -> GitHead | None:
+    """Return the HEAD revision and branch of repo_dir, or None if it can't be resolved."""
+    try:
+        git_dir = find_git_dir(repo_dir)
+        if git_dir is None:
+            return None
+        common_dir = find_common_dir(git_dir)
+        head = (git_dir / "HEAD").read_text().strip()
+    except OSError:
+        return None
+
+    if not head.startswith("ref: "):  # detached HEAD
+        return GitHead(revision=head, branch=None) if SHA_PATTERN.match(head) else None
+
+    ref = head.removeprefix("ref: ").strip()
+    branch = ref.removeprefix("refs/heads/") if ref.startswith("refs/heads/") else None
+    revision = resolve_ref(ref, git_dir, common_dir)
+    if revision is None:
+        return None
+    return GitHead(revision=revision, branch=branch)
+
+
+def find_git_dir(repo_dir: Path) -> Path | None:
+    """Return the git dir of repo_dir, following 'gitdir:' files used by worktrees."""
+    dot_git = repo_dir / ".git"
+    if dot_git.is_dir():
+        return dot_git
+    if dot_git.is_file():
+        content = dot_git.read_text().strip()
+        if content.startswith("gitdir: "):
+            return repo_dir / content.removeprefix("gitdir: ").strip()
+    return None
+
+
+def find_common_dir(git_dir: Path) -> Path:
+    """Return the dir shared by all worktrees, where branches and packed-refs live."""
+    commondir_file = git_dir / "commondir"
+    if commondir_file.is_file():
+        return git_dir / commondir_file.read_text().strip()
+    return git_dir
+
+
+def resolve_ref(ref: str, git_dir: Path, common_dir: Path) -> str | None:
+    """Resolve ref to a sha from loose refs or packed-refs, following symbolic refs."""
+    for _ in range(MAX_SYMREF_DEPTH):
+        value = read_loose_ref(ref, git_dir, common_dir)
+        if value is None:
+            value = read_packed_ref(ref, common_dir)
+        if value is None:
+            return None
+        if value.startswith("ref: "):
+            ref = value.removeprefix("ref: ").strip()
+            continue
+        return value if SHA_PATTERN.match(value) else None
+    return None
+
+
+def read_loose_ref(ref: str, git_dir: Path, common_dir: Path) -> str | None:
+    for base_dir in dict.fromkeys([git_dir, common_dir]):
+        try:
+            return (base_dir / ref).read_text().strip()
+        except OSError:
+            continue
+    return None
+
+
+def read_packed_ref(ref: str, common_dir: Path) -> str | None:
+    try:
+        packed_refs = (common_dir / "packed-refs").read_text()
+    except OSError:
+        return None
+    for line in packed_refs.splitlines():
+        if not line or line.startswith(("#", "^")):
+            continue
+        sha, _, name = line.partition(" ")
+        if name.strip() == ref:
+            return sha
+    return None
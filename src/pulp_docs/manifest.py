@@ -0,0 +1,113 @@
+"""
+Module for persisting what was discovered about components between builds.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import typing as t
+from pathlib import Path
+
+from mkdocs.plugins import get_plugin_logger
+
+from pulp_docs.gitrefs import read_git_head
+
+log = get_plugin_logger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+class ComponentManifest:
+    """On-disk cache of component discovery results.
+
+    An entry is valid while the mtimes of the paths it watches and the HEAD of its
+    repository are unchanged. Directories are watched for files being added, removed or
+    renamed, and files (e.g, pyproject.toml) for being edited. Watched paths that didn't
+    exist must still not exist.
+
+    Args:
+        manifest_file: The json file where entries are stored.
+    """
+
+    def __init__(self, manifest_file: Path):
+        self.manifest_file = manifest_file
+        self.hits = 0
+        self.misses = 0
+        self._entries = self._load()
+        self._changed = False
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict[str, t.Any] | None:
+        """Return the data stored for key, if it's still valid."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or not self._is_fresh(entry):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry["data"]
+
+    def put(
+        self, key: str, data: dict[str, t.Any], repo_dir: Path, watched: t.Iterable[Path]
+    ) -> None:
+        """Store data for key, if the HEAD of repo_dir can be read to validate it later."""
+        git_head = read_git_head(repo_dir)
+        if git_head is None:
+            return
+        entry = {
+            "data": data,
+            "repo_dir": str(repo_dir),
+            "head": list(git_head),
+            "watched": {str(path): _mtime(path) for path in watched},
+        }
+        with self._lock:
+            self._entries[key] = entry
+            self._changed = True
+
+    def save(self) -> None:
+        """Write the entries to the manifest file, if any was added.
+
+        The manifest is only a cache: if it can't be written, a warning is logged.
+        """
+        with self._lock:
+            if not self._changed:
+                return
+            content = json.dumps({"version": MANIFEST_VERSION, "entries": self._entries})
+            self._changed = False
+        try:
+            self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.manifest_file.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_name, self.manifest_file)
+        except OSError as e:
+            log.warning(f"Could not save the components manifest: {e}")
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def _is_fresh(self, entry: dict[str, t.Any]) -> bool:
+        for path, mtime in entry["watched"].items():
+            if _mtime(Path(path)) != mtime:
+                return False
+        git_head = read_git_head(Path(entry["repo_dir"]))
+        return git_head is not None and list(git_head) == entry["head"]
+
+    def _load(self) -> dict[str, dict[str, t.Any]]:
+        try:
+            data = json.loads(self.manifest_file.read_text())
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data["entries"]
+
+
+def _mtime(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
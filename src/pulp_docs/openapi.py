@@ -2,29 +2,242 @@
 Module for generating open-api json files for selected Pulp plugins.
 """
 
+import contextlib
+import gzip
+import hashlib
 import json
+import mmap
 import os
+import re
+import shutil
 import subprocess
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import NamedTuple
+from typing import Iterator, NamedTuple
 
+from mkdocs.plugins import get_plugin_logger
 
-def annotate_api_json(api_json: str) -> str:
-    """Append version info from x-pulp-app-versions to the spec description."""
-    spec = json.loads(api_json)
-    versions = spec.get("info", {}).get("x-pulp-app-versions", {})
-    if not versions:
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are written without it
+    brotli = None
+
+log = get_plugin_logger(__name__)
+
+# Writes the openapi spec of many components while booting Django only once.
+# Usage: python -c SHARED_ENV_SCRIPT <label> <file> [<label> <file> ...]
+SHARED_ENV_SCRIPT = """\
+import os
+import sys
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "pulpcore.app.settings")
+import django
+
+django.setup()
+from django.core.management import call_command
+
+args = sys.argv[1:]
+for label, file in zip(args[::2], args[1::2]):
+    call_command("openapi", "--component", label, "--file", file)
+"""
+
+
+# Strings and brackets are all that's needed to find the members of a json document
+JSON_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]')
+JSON_MEMBER_SEP = re.compile(rb"\s*:")
+
+
+def annotate_api_json(api_json: str, component: str | None = None) -> str:
+    """Append version info from x-pulp-app-versions to the spec description.
+
+    Only the info object is re-serialized, the rest of the spec is kept as is.
+
+    Args:
+        api_json: The openapi spec.
+        component: If given, only the versions of this component and core are shown.
+            Specs generated in a shared environment list every installed app.
+    """
+    buffer = api_json.encode()
+    splice = _info_splice(buffer, component)
+    if splice is None:
         return api_json
+    start, end, new_info = splice
+    return (buffer[:start] + new_info + buffer[end:]).decode()
+
+
+def annotate_api_json_file(spec_file: Path, component: str | None = None) -> None:
+    """Annotate the spec in spec_file in place, see annotate_api_json.
+
+    The file is mapped instead of read, so only its info object is ever decoded.
+    """
+    with open(spec_file, "rb") as fd:
+        if os.fstat(fd.fileno()).st_size == 0:
+            return
+        with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            splice = _info_splice(buffer, component)
+            if splice is None:
+                return
+            start, end, new_info = splice
+            tmp_fd, tmp_name = tempfile.mkstemp(dir=spec_file.parent, suffix=".tmp")
+            with os.fdopen(tmp_fd, "wb") as tmp_file, memoryview(buffer) as view:
+                tmp_file.write(view[:start])
+                tmp_file.write(new_info)
+                tmp_file.write(view[end:])
+    os.replace(tmp_name, spec_file)
+
+
+def _info_splice(
+    buffer: bytes | mmap.mmap, component: str | None = None
+) -> tuple[int, int, bytes] | None:
+    """Return the span of the top-level info object and its annotated replacement."""
+    span = _top_level_object_span(buffer, "info")
+    if span is None:
+        return None
+    start, end = span
+    info = json.loads(bytes(buffer[start:end]))
+    versions = info.get("x-pulp-app-versions", {})
+    if component is not None:
+        versions = {k: v for k, v in versions.items() if k in (component, "core")}
+    if not versions:
+        return None
     non_core = [f"pulp_{k} {v}" for k, v in versions.items() if k != "core"]
     core = [f"pulpcore {v}" for k, v in versions.items() if k == "core"]
     # core is secondary: shown in parens when a plugin is present, primary otherwise
     parts = non_core + [f"({c})" for c in core] if non_core else core
     version_string = " ".join(parts)
-    existing_desc = spec["info"].get("description", "")
-    description = f"{existing_desc}\n\nGenerated from: {version_string}".strip()
-    spec["info"]["description"] = description
-    return json.dumps(spec, indent=2)
+    existing_desc = info.get("description", "")
+    info["description"] = f"{existing_desc}\n\nGenerated from: {version_string}".strip()
+    new_info = json.dumps(info, separators=(",", ":"), ensure_ascii=False).encode()
+    return start, end, new_info
+
+
+def _top_level_object_span(buffer: bytes | mmap.mmap, key: str) -> tuple[int, int] | None:
+    """Return the span of the object value of key in the top-level json object.
+
+    The document is scanned only up to the end of that value.
+    """
+    depth = 0
+    start = None
+    found_key = False
+    for match in JSON_TOKEN.finditer(buffer):
+        token = match.group()
+        if token in (b"{", b"["):
+            if found_key and depth == 1:
+                if token != b"{":
+                    return None
+                start = match.start()
+            depth += 1
+        elif token in (b"}", b"]"):
+            depth -= 1
+            if start is not None and depth == 1:
+                return start, match.end()
+            if depth == 0:
+                return None
+        elif depth == 1 and not found_key and JSON_MEMBER_SEP.match(buffer, match.end()):
+            found_key = json.loads(token) == key
+        elif found_key and depth == 1:
+            return None  # the value is a string
+    return None
+
+
+# Quality 11 is too slow for multi-megabyte specs, 9 is close in size at a fraction of the time
+BROTLI_QUALITY = 9
+API_ASSET_NAMES = ("api.json", "api.json.gz", "api.json.br")
+JSON_WHITESPACE = b" \t\n\r"
+# What json has between strings and brackets, once whitespace is removed
+JSON_SCALARS = re.compile(rb"[\w.+\-:,]*")
+
+
+def write_api_assets(spec_file: Path) -> dict[str, Path]:
+    """Write the spec minified and precompressed, ready to be served as static files.
+
+    Web servers can serve the .gz and .br variants to clients that accept them.
+    The spec is minified and compressed in chunks, so it's never held in memory.
+    Specs that aren't valid json (e.g, in dry-run) are served as they are.
+
+    Returns:
+        The asset files by their name: api.json, api.json.gz and, if brotli is
+        installed, api.json.br.
+    """
+    assets_dir = api_assets_dir(spec_file)
+    assets_dir.mkdir(exist_ok=True)
+    asset_files = {name: assets_dir / name for name in API_ASSET_NAMES}
+    if brotli is None:
+        del asset_files["api.json.br"]
+    try:
+        with open(spec_file, "rb") as fd:
+            if os.fstat(fd.fileno()).st_size == 0:
+                raise ValueError("empty spec")
+            with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                _write_minified(buffer, asset_files)
+    except ValueError:
+        shutil.rmtree(assets_dir, ignore_errors=True)
+        return {"api.json": spec_file}
+    return asset_files
+
+
+def api_assets_dir(spec_file: Path) -> Path:
+    return spec_file.parent / f"{spec_file.stem}-assets"
+
+
+def api_asset_files(spec_file: Path) -> dict[str, Path]:
+    """Return the assets written for spec_file by write_api_assets, without writing them."""
+    assets_dir = api_assets_dir(spec_file)
+    asset_files = {name: assets_dir / name for name in API_ASSET_NAMES}
+    asset_files = {name: file for name, file in asset_files.items() if file.is_file()}
+    return asset_files or {"api.json": spec_file}
+
+
+def _write_minified(buffer: mmap.mmap, asset_files: dict[str, Path]) -> None:
+    brotli_file = asset_files.get("api.json.br")
+    with (
+        open(asset_files["api.json"], "wb") as json_file,
+        open(asset_files["api.json.gz"], "wb") as gz_raw,
+        gzip.GzipFile(filename="", mode="wb", fileobj=gz_raw, mtime=0) as gz_file,
+        open(brotli_file, "wb") if brotli_file else contextlib.nullcontext() as br_file,
+    ):
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY) if brotli_file else None
+        for chunk in _minified_chunks(buffer):
+            json_file.write(chunk)
+            gz_file.write(chunk)
+            if compressor:
+                br_file.write(compressor.process(chunk))
+        if compressor:
+            br_file.write(compressor.finish())
+
+
+def _minified_chunks(buffer: mmap.mmap, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+    """Yield the json document in buffer without whitespace, in chunks of about chunk_size.
+
+    Strings are copied as they are. Raises ValueError if buffer doesn't hold a single
+    json object or array.
+    """
+    chunk = bytearray()
+    depth = 0
+    pos = 0
+    for match in JSON_TOKEN.finditer(buffer):
+        gap = buffer[pos : match.start()].translate(None, JSON_WHITESPACE)
+        token = match.group()
+        if depth == 0 and (pos or gap or token not in (b"{", b"[")):
+            raise ValueError("not a json object or array")
+        if gap and not JSON_SCALARS.fullmatch(gap):
+            raise ValueError(f"unexpected json content at {pos}")
+        chunk += gap
+        chunk += token
+        if token in (b"{", b"["):
+            depth += 1
+        elif token in (b"}", b"]"):
+            depth -= 1
+        pos = match.end()
+        if len(chunk) >= chunk_size:
+            yield bytes(chunk)
+            chunk.clear()
+    if depth or not pos or buffer[pos:].translate(None, JSON_WHITESPACE):
+        raise ValueError("truncated json or trailing content")
+    yield bytes(chunk)
 
 
 class PulpResolutionError(Exception):
@@ -36,6 +249,109 @@ class PulpResolutionError(Exception):
 class OpenApiPlugin(NamedTuple):
     repository_path: Path
     plugin_label: str
+    git_revision: str = ""
+    # None when it's unknown whether the repository has uncommitted changes
+    git_dirty: bool | None = False
+
+
+class OpenAPISpecCache:
+    """Persistent cache of generated openapi specs.
+
+    Entries are keyed by the plugin label, the git revision of its repository and whether
+    the spec was generated in a shared environment, which may resolve other dependencies.
+    Repositories with uncommitted changes or unknown revisions are never cached, as their
+    revision doesn't identify the code the spec was generated from.
+
+    Args:
+        cache_dir: Directory where the spec files are stored.
+        max_entries: Maximum number of specs kept. Least recently used are evicted first.
+        max_age: Maximum age (in seconds) of an entry since it was last used.
+    """
+
+    def __init__(self, cache_dir: Path, max_entries: int = 100, max_age: float = 30 * 86400):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, plugin: OpenApiPlugin, shared_env: bool = False) -> str | None:
+        # specs of dirty repositories, or where that wasn't checked, may not match the revision
+        if plugin.git_dirty is not False or plugin.git_revision in ("", "unknown"):
+            return None
+        mode = "shared" if shared_env else "isolated"
+        raw_key = f"{plugin.plugin_label}:{plugin.git_revision}:{mode}"
+        return hashlib.sha256(raw_key.encode()).hexdigest()
+
+    def get(self, plugin: OpenApiPlugin, shared_env: bool = False) -> Path | None:
+        """Return the cached spec file for plugin, if any.
+
+        Specs generated in isolation are also used for shared_env builds, as a shared
+        environment falls back to isolated ones, but not the other way around.
+        """
+        keys = [self.key(plugin), self.key(plugin, shared_env=True) if shared_env else None]
+        cached_files = [self.cache_dir / f"{key}.json" for key in keys if key]
+        cached_file = next((f for f in cached_files if f.is_file()), None)
+        if cached_file is None:
+            self.misses += 1
+            return None
+        # refresh mtime, so eviction is based on last usage
+        with contextlib.suppress(OSError):
+            cached_file.touch()
+        self.hits += 1
+        return cached_file
+
+    def put(self, plugin: OpenApiPlugin, spec_file: Path, shared_env: bool = False) -> None:
+        """Store a copy of spec_file and its assets for plugin, if it's cacheable.
+
+        The cache is best effort: if it can't be written, a warning is logged.
+        """
+        key = self.key(plugin, shared_env)
+        if key is None:
+            return
+        try:
+            self._put(key, spec_file)
+        except OSError as e:
+            log.warning(f"Could not cache the openapi spec of {plugin.plugin_label}: {e}")
+
+    def _put(self, key: str, spec_file: Path) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        cached_file = self.cache_dir / f"{key}.json"
+        assets_dir = api_assets_dir(spec_file)
+        if assets_dir.is_dir():
+            tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                shutil.copytree(assets_dir, tmp_dir, dirs_exist_ok=True)
+                shutil.rmtree(api_assets_dir(cached_file), ignore_errors=True)
+                os.replace(tmp_dir, api_assets_dir(cached_file))
+            finally:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            shutil.copyfile(spec_file, tmp_name)
+            os.replace(tmp_name, cached_file)
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+
+    def evict(self) -> None:
+        """Remove expired entries and the least recently used ones over max_entries."""
+        if not self.cache_dir.is_dir():
+            return
+        try:
+            entries = sorted(
+                self.cache_dir.glob("*.json"), key=lambda f: f.stat().st_mtime, reverse=True
+            )
+            now = time.time()
+            for i, entry in enumerate(entries):
+                if i >= self.max_entries or now - entry.stat().st_mtime > self.max_age:
+                    entry.unlink(missing_ok=True)
+                    shutil.rmtree(api_assets_dir(entry), ignore_errors=True)
+        except OSError as e:
+            log.warning(f"Could not evict openapi specs from {self.cache_dir}: {e}")
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
 
 
 class OpenAPIGenerator:
@@ -44,17 +360,35 @@ class OpenAPIGenerator:
     Args:
         plugins: A list of OpenApiPlugin with repository paths and labels.
         dry_run: Whether it should execute the commands or just show them.
+        cache: An optional cache to reuse specs generated by previous builds.
+        jobs: How many schemas can be generated concurrently.
+        shared_env: Whether to try generating all schemas from a single uv environment.
+            Falls back to one isolated environment per plugin if that can't be resolved.
     """
 
     # use this content instead of the real openapi spec when dry-run is enabled
     DRY_RUN_SPECFILE_TEMPLATE = "dry-run specfile for: {plugin_label}"
 
-    def __init__(self, plugins: list[OpenApiPlugin], dry_run: bool = False):
+    def __init__(
+        self,
+        plugins: list[OpenApiPlugin],
+        dry_run: bool = False,
+        cache: OpenAPISpecCache | None = None,
+        jobs: int = 1,
+        shared_env: bool = False,
+    ):
         missing = [p.plugin_label for p in plugins if not p.repository_path]
         if missing:
             raise ValueError(f"Plugins missing repository path: {missing}")
         self.label_to_path = {p.plugin_label: p.repository_path for p in plugins}
+        self.label_to_plugin = {p.plugin_label: p for p in plugins}
         self.dry_run = dry_run
+        self.cache = cache
+        self.jobs = max(jobs, 1)
+        self.shared_env = shared_env
+        self._running: set[subprocess.Popen] = set()
+        self._running_lock = threading.Lock()
+        self._cancelled = threading.Event()
 
     def generate(self) -> dict[str, Path]:
         """Generate openapi json files.
@@ -64,18 +398,125 @@ class OpenAPIGenerator:
         if not self.label_to_path:
             return {}
         output_dir = Path(tempfile.mkdtemp())
-        label_to_specfile = {}
-        for label in self.label_to_path:
-            filename = f"{label}-api.json"
-            file_path = output_dir / filename
-            self._generate_schema(label, file_path)
-            label_to_specfile[label] = file_path
+        label_to_specfile = {
+            label: output_dir / f"{label}-api.json" for label in self.label_to_path
+        }
+        use_cache = self.cache is not None and not self.dry_run
+        pending = [
+            label
+            for label, file_path in label_to_specfile.items()
+            if not (use_cache and self._restore_cached(label, file_path))
+        ]
+        shared_env = self.shared_env and len(pending) > 1
+        if shared_env:
+            try:
+                self._generate_shared(pending, label_to_specfile)
+            except (PulpResolutionError, RuntimeError) as e:
+                log.warning(f"Shared environment failed, isolating each plugin instead.\n{e}")
+                shared_env = False
+                self._generate_isolated(pending, label_to_specfile)
+        else:
+            self._generate_isolated(pending, label_to_specfile)
+        # assets are written once per generated spec, and cached along with it
+        for label in pending:
+            write_api_assets(label_to_specfile[label])
+        if use_cache:
+            for label in pending:
+                plugin = self.label_to_plugin[label]
+                self.cache.put(plugin, label_to_specfile[label], shared_env=shared_env)
+            self.cache.evict()
         return label_to_specfile
 
-    def _generate_schema(self, plugin_label: str, output_file: Path):
+    def _restore_cached(self, plugin_label: str, output_file: Path) -> bool:
+        cached_file = self.cache.get(self.label_to_plugin[plugin_label], self.shared_env)
+        if cached_file is None:
+            return False
+        shutil.copyfile(cached_file, output_file)
+        if api_assets_dir(cached_file).is_dir():
+            shutil.copytree(
+                api_assets_dir(cached_file), api_assets_dir(output_file), dirs_exist_ok=True
+            )
+        else:
+            write_api_assets(output_file)
+        return True
+
+    def _generate_isolated(self, labels: list[str], label_to_specfile: dict[str, Path]):
+        if self.jobs == 1 or len(labels) <= 1:
+            for label in labels:
+                self._generate_schema(label, label_to_specfile[label])
+        else:
+            self._generate_concurrently(labels, label_to_specfile)
+
+    def _generate_concurrently(self, labels: list[str], label_to_specfile: dict[str, Path]):
+        """Generate schemas in a thread pool, failing on the first error.
+
+        When some generation fails, pending ones are cancelled and running subprocesses
+        are terminated before the error is re-raised.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.jobs)
+        futures = [
+            executor.submit(self._generate_schema, label, label_to_specfile[label])
+            for label in labels
+        ]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except BaseException:
+            self._cancelled.set()
+            self._terminate_running()
+            raise
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _terminate_running(self):
+        with self._running_lock:
+            for proc in self._running:
+                proc.terminate()
+
+    def _run(self, cmd: list[str]):
+        """Run cmd as subprocess.run(check=True) would, but allow terminating it."""
+        with self._running_lock:
+            if self._cancelled.is_set():
+                raise RuntimeError("OpenAPI generation was cancelled.")
+            proc = subprocess.Popen(
+                cmd,
+                stderr=subprocess.PIPE,
+                env={**os.environ, "PULP_CONTENT_ORIGIN": "NONE"},
+            )
+            self._running.add(proc)
+        try:
+            _, stderr = proc.communicate()
+        finally:
+            with self._running_lock:
+                self._running.discard(proc)
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, cmd, stderr=stderr)
+
+    def _uv_run_cmd(self, labels: list[str]) -> list[str]:
         cmd = ["uv", "run", "--isolated", "--with", "setuptools"]
-        repo_path = self.label_to_path[plugin_label]
-        cmd.extend(["--with", str(repo_path.resolve())])
+        repo_paths = dict.fromkeys(str(self.label_to_path[label].resolve()) for label in labels)
+        for repo_path in repo_paths:
+            cmd.extend(["--with", repo_path])
+        return cmd
+
+    def _generate_shared(self, labels: list[str], label_to_specfile: dict[str, Path]):
+        """Generate all schemas from a single environment and Django process."""
+        cmd = self._uv_run_cmd(labels)
+        cmd.extend(["python", "-c", SHARED_ENV_SCRIPT])
+        for label in labels:
+            cmd.extend([label, str(label_to_specfile[label])])
+        if self.dry_run:
+            print(" ".join(cmd))
+            for label in labels:
+                content = self.DRY_RUN_SPECFILE_TEMPLATE.format(plugin_label=label)
+                label_to_specfile[label].write_text(content)
+            return
+        self._run_uv(cmd)
+        for label in labels:
+            annotate_api_json_file(label_to_specfile[label], component=label)
+
+    def _generate_schema(self, plugin_label: str, output_file: Path):
+        cmd = self._uv_run_cmd([plugin_label])
         cmd.extend(
             ["pulpcore-manager", "openapi", "--component", plugin_label, "--file", str(output_file)]
         )
@@ -83,14 +524,12 @@ class OpenAPIGenerator:
             print(" ".join(cmd))
             output_file.write_text(self.DRY_RUN_SPECFILE_TEMPLATE.format(plugin_label=plugin_label))
             return
+        self._run_uv(cmd)
+        annotate_api_json_file(output_file)
+
+    def _run_uv(self, cmd: list[str]):
         try:
-            subprocess.run(
-                cmd,
-                check=True,
-                stderr=subprocess.PIPE,
-                env={**os.environ, "PULP_CONTENT_ORIGIN": "NONE"},
-            )
-            output_file.write_text(annotate_api_json(output_file.read_text()))
+            self._run(cmd)
         except subprocess.CalledProcessError as e:
             # catch UV resolution error based on their error message
             stderr = e.stderr.decode()
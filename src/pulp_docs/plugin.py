@@ -1,26 +1,53 @@
 import json
 import os
 import sys
+import threading
 import tomllib
 import typing as t
 from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import deepcopy
 from dataclasses import dataclass, replace
+from functools import partial
 from pathlib import Path
 
-import httpx
 import yaml
 from git import Repo
 from mkdocs.config import Config, config_options, load_config
 from mkdocs.config.defaults import MkDocsConfig
 from mkdocs.exceptions import PluginError
+from mkdocs.livereload import LiveReloadServer
 from mkdocs.plugins import BasePlugin, get_plugin_logger
 from mkdocs.structure.files import File, Files
 from mkdocs.structure.nav import Link, Navigation, Section
 from mkdocs.structure.pages import Page
 from mkdocs.utils.templates import TemplateContext
-
-from pulp_docs.context import ctx_blog, ctx_docstrings, ctx_draft, ctx_dryrun, ctx_openapi, ctx_path
-from pulp_docs.openapi import OpenAPIGenerator, OpenApiPlugin, PulpResolutionError
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+
+from pulp_docs.context import (
+    ctx_blog,
+    ctx_cache_dir,
+    ctx_docstrings,
+    ctx_draft,
+    ctx_dryrun,
+    ctx_git_dirty_check,
+    ctx_openapi,
+    ctx_openapi_jobs,
+    ctx_openapi_shared_env,
+    ctx_path,
+    ctx_profile_build,
+)
+from pulp_docs.gitrefs import read_git_head
+from pulp_docs.manifest import ComponentManifest
+from pulp_docs.openapi import (
+    OpenAPIGenerator,
+    OpenApiPlugin,
+    OpenAPISpecCache,
+    PulpResolutionError,
+    api_asset_files,
+)
+from pulp_docs.profiling import BuildProfiler
+from pulp_docs.rss import RSS_FEED_URL, RSSFeed
 
 log = get_plugin_logger(__name__)
 
@@ -39,6 +66,8 @@ This is a generated page. See how to add a custom overview page for your plugin
 [here](site:pulp-docs/docs/dev/guides/create-plugin-overviews/).
 """
 
+SITEMAP_PLACEHOLDER = "PULP_SITEMAP"
+
 
 @config_options.SubConfig
 class ComponentSpec(Config):
@@ -75,8 +104,13 @@ class LoadedComponent:
     repository_dir: Path
     pkg_version: str
     git_revision: str
-    git_dirty: bool
+    # None when the dirty check was skipped
+    git_dirty: t.Optional[bool]
     openapi_spec: t.Optional[Path] = None
+    git_branch: t.Optional[str] = None
+    github_org: str = "pulp"
+    # Files under the docs dir, when they were listed while loading
+    docs_files: t.Optional[tuple[str, ...]] = None
 
     @property
     def component_dir(self) -> Path:
@@ -95,6 +129,16 @@ class LoadedComponent:
         return self.spec.label
 
 
+@dataclass(frozen=True)
+class GitMetadata:
+    """The git state of a repository, inspected once per build."""
+
+    revision: str
+    branch: t.Optional[str]
+    # None when the dirty check was skipped or failed
+    dirty: t.Optional[bool]
+
+
 class LoadResult(t.NamedTuple):
     all_specs: list[ComponentSpec]
     loaded: list[LoadedComponent]
@@ -112,14 +156,20 @@ class RepositoryFinder:
             self._add_lookup_path(lookup_path)
 
     def find(self, repo_name: str) -> Path | None:
+        for repo_dir in self.candidates(repo_name):
+            if repo_dir.exists():
+                return repo_dir
+        return None
+
+    def candidates(self, repo_name: str) -> list[Path]:
+        """Return where repo_name is looked for, in lookup order."""
+        candidates = []
         for lookup_dir, filter_list in self.lookup_dir_to_filter_list.items():
             # apply path scoping if it's a scoped path
             if filter_list and repo_name not in filter_list:
                 continue
-            repo_dir = lookup_dir / repo_name
-            if repo_dir.exists():
-                return repo_dir
-        return None
+            candidates.append(lookup_dir / repo_name)
+        return candidates
 
     def _add_lookup_path(self, lookup_path: str):
         """Add either global or scoped lookup_path internally.
@@ -141,6 +191,11 @@ class ComponentLoader:
         lookup_paths: list[str],
         component_specs: list[ComponentSpec],
         draft: bool = False,
+        cache_dir: Path | None = None,
+        openapi_jobs: int = 1,
+        openapi_shared_env: bool = False,
+        check_git_dirty: bool = True,
+        profiler: BuildProfiler | None = None,
     ):
         """Manage finding and loading plugins from config file or mkdocs plugin.
 
@@ -149,10 +204,25 @@ class ComponentLoader:
                 the form: [repo@]path. Example: "pulpcore@/tmp/", "/tmp/workdir".
             component_specs: The list of component specs to load.
             draft: Whether it fails if any component is missing
+            cache_dir: Directory for persistent caches, such as the manifest of the components
+                found by previous builds. Caching is disabled if None.
+            openapi_jobs: How many openapi specs can be generated concurrently.
+            openapi_shared_env: Whether to generate openapi specs from a single environment.
+            check_git_dirty: Whether to check for uncommitted changes. Slow on big repositories.
+            profiler: An optional profiler to record the loading phases.
         """
         self.component_specs = component_specs
+        self.lookup_paths = lookup_paths
         self.repository_finder = RepositoryFinder(lookup_paths)
         self.draft = draft
+        self.openapi_cache = OpenAPISpecCache(cache_dir / "openapi") if cache_dir else None
+        self.manifest = ComponentManifest(cache_dir / "manifest.json") if cache_dir else None
+        self.openapi_jobs = openapi_jobs
+        self.openapi_shared_env = openapi_shared_env
+        self.check_git_dirty = check_git_dirty
+        self.profiler = profiler or BuildProfiler(enabled=False)
+        self._git_inspections: dict[Path, Future[GitMetadata]] = {}
+        self._git_inspections_lock = threading.Lock()
 
     @classmethod
     def from_mkdocs_config(
@@ -163,23 +233,46 @@ class ComponentLoader:
 
     @classmethod
     def from_plugin(
-        cls, pulpdocs_plugin: "PulpDocsPlugin", lookup_paths: list[str], draft: bool = False
+        cls,
+        pulpdocs_plugin: "PulpDocsPlugin",
+        lookup_paths: list[str],
+        draft: bool = False,
+        cache_dir: Path | None = None,
+        openapi_jobs: int = 1,
+        openapi_shared_env: bool = False,
+        check_git_dirty: bool = True,
+        profiler: BuildProfiler | None = None,
     ) -> "ComponentLoader":
-        return cls(lookup_paths, pulpdocs_plugin.config.components, draft=draft)
+        return cls(
+            lookup_paths,
+            pulpdocs_plugin.config.components,
+            draft=draft,
+            cache_dir=cache_dir,
+            openapi_jobs=openapi_jobs,
+            openapi_shared_env=openapi_shared_env,
+            check_git_dirty=check_git_dirty,
+            profiler=profiler,
+        )
 
     def load_all(self, generate_openapi: bool = False) -> LoadResult:
         loaded_comps: list[LoadedComponent] = []
         missing_comps: list[ComponentSpec] = []
 
-        for comp_spec in self.component_specs:
-            loaded_comp = self.load_component(comp_spec)
+        # Each component is loaded in its own thread, but the results keep the spec order
+        with self.profiler.phase("load_all"), ThreadPoolExecutor() as executor:
+            results = list(executor.map(self._profiled_load_component, self.component_specs))
+
+        for comp_spec, loaded_comp in zip(self.component_specs, results):
             if loaded_comp:
                 loaded_comps.append(loaded_comp)
             else:
                 missing_comps.append(comp_spec)
+        if self.manifest:
+            self.manifest.save()
 
         if generate_openapi:
-            loaded_comps = self.generate_openapi_specs(loaded_comps)
+            with self.profiler.phase("generate_openapi_specs"):
+                loaded_comps = self.generate_openapi_specs(loaded_comps)
 
         return LoadResult(
             all_specs=self.component_specs,
@@ -187,30 +280,118 @@ class ComponentLoader:
             missing=sorted(missing_comps, key=lambda c: c.component_name),
         )
 
+    def _profiled_load_component(self, comp_spec: ComponentSpec) -> LoadedComponent | None:
+        with self.profiler.phase("load_component", component=comp_spec.component_name):
+            return self.load_component(comp_spec)
+
     def load_component(self, comp_spec: ComponentSpec) -> LoadedComponent | None:
+        manifest_key = json.dumps([dict(comp_spec), self.lookup_paths], sort_keys=True, default=str)
+        cached = self.manifest.get(manifest_key) if self.manifest else None
+        if cached:
+            return self._load_from_manifest(comp_spec, cached)
+
         repo_name = comp_spec.repository_name
         repo_dir = self.repository_finder.find(repo_name)
         if repo_dir:
             comp_dir = repo_dir.parent / comp_spec.component_name
             extractor = DataExtractor(comp_dir, repo_dir)
-            return LoadedComponent(
+            git_metadata = self._inspect_git(extractor)
+            loaded_comp = LoadedComponent(
                 spec=comp_spec,
                 repository_dir=repo_dir,
                 pkg_version=extractor.package_version() or "unknown",
-                git_revision=extractor.git_revision() or "unknown",
-                git_dirty=extractor.is_git_dirty(),
+                git_revision=git_metadata.revision,
+                git_dirty=git_metadata.dirty,
+                git_branch=git_metadata.branch,
+                github_org=extractor.github_org(repo_dir.parent / comp_spec.path),
             )
+            if self.manifest:
+                loaded_comp = self._add_to_manifest(manifest_key, loaded_comp)
+            return loaded_comp
         return None
 
+    def _add_to_manifest(self, manifest_key: str, comp: LoadedComponent) -> LoadedComponent:
+        """Store comp in the manifest, listing its docs so they can be skipped next time."""
+        docs_dir = component_docs_dir(comp)
+        docs_files, docs_dirs = list_docs(docs_dir)
+        comp = replace(comp, docs_files=tuple(docs_files))
+        data = {
+            "repository_dir": str(comp.repository_dir),
+            "pkg_version": comp.pkg_version,
+            "git_revision": comp.git_revision,
+            "git_branch": comp.git_branch,
+            "github_org": comp.github_org,
+            "docs_files": docs_files,
+        }
+        # repositories created in a lookup dir that comes first would take precedence
+        candidates = self.repository_finder.candidates(comp.repository_name)
+        shadowing_dirs = candidates[: candidates.index(comp.repository_dir)]
+        comp_dir = comp.repository_dir.parent / comp.component_name
+        watched = [
+            *shadowing_dirs,
+            comp.repository_dir,
+            comp_dir,
+            comp_dir / "pyproject.toml",
+            comp.component_dir / "template_config.yml",
+            *docs_dirs,
+        ]
+        self.manifest.put(manifest_key, data, comp.repository_dir, watched)
+        return comp
+
+    def _load_from_manifest(self, comp_spec: ComponentSpec, data: dict) -> LoadedComponent:
+        repo_dir = Path(data["repository_dir"])
+        git_dirty = None
+        if self.check_git_dirty:
+            comp_dir = repo_dir.parent / comp_spec.component_name
+            git_dirty = self._inspect_git(DataExtractor(comp_dir, repo_dir)).dirty
+        return LoadedComponent(
+            spec=comp_spec,
+            repository_dir=repo_dir,
+            pkg_version=data["pkg_version"],
+            git_revision=data["git_revision"],
+            git_dirty=git_dirty,
+            git_branch=data["git_branch"],
+            github_org=data["github_org"],
+            docs_files=tuple(data["docs_files"]),
+        )
+
+    def _inspect_git(self, extractor: "DataExtractor") -> GitMetadata:
+        """Return the git metadata, inspecting each repository only once.
+
+        Many components may live in the same repository (e.g, pulpcore and pulp_file).
+        """
+        with self._git_inspections_lock:
+            inspection = self._git_inspections.get(extractor.repo_dir)
+            is_owner = inspection is None
+            if is_owner:
+                inspection = self._git_inspections[extractor.repo_dir] = Future()
+        if is_owner:
+            # the other components of the repository wait on the inspection, even if it fails
+            try:
+                inspection.set_result(extractor.git_metadata(check_dirty=self.check_git_dirty))
+            except BaseException as e:
+                inspection.set_exception(e)
+        return inspection.result()
+
     def generate_openapi_specs(self, loaded: list[LoadedComponent]) -> list[LoadedComponent]:
         openapi_plugins = [
-            OpenApiPlugin(repository_path=comp.repository_dir, plugin_label=comp.label)
+            OpenApiPlugin(
+                repository_path=comp.repository_dir,
+                plugin_label=comp.label,
+                git_revision=comp.git_revision,
+                git_dirty=comp.git_dirty,
+            )
             for comp in loaded
             if comp.spec.rest_api
         ]
         labels = [p.plugin_label for p in openapi_plugins]
         log.info(f"Generating OpenAPI specs for: {labels}")
-        generator = OpenAPIGenerator(openapi_plugins)
+        generator = OpenAPIGenerator(
+            openapi_plugins,
+            cache=self.openapi_cache,
+            jobs=self.openapi_jobs,
+            shared_env=self.openapi_shared_env,
+        )
         try:
             label_to_spec = generator.generate()
         except PulpResolutionError as e:
@@ -230,6 +411,18 @@ class DataExtractor:
         self.comp_dir = comp_dir
         self.repo_dir = repo_dir
 
+    def github_org(self, component_dir: Path) -> str:
+        """Read the github org from the template config at the root of component_dir.
+
+        component_dir is where the component lives in its repository, which may be nested
+        (e.g, pulpcore/pulp_file), unlike comp_dir.
+        """
+        try:
+            template_config = component_dir / "template_config.yml"
+            return yaml.safe_load(template_config.read_text())["github_org"]
+        except Exception:
+            return "pulp"
+
     def package_version(self) -> t.Optional[str]:
         try:
             pyproject = self.comp_dir / "pyproject.toml"
@@ -238,27 +431,54 @@ class DataExtractor:
             log.warning(f"Couldnt' get  version for: {str(self.comp_dir)}")
         return None
 
-    def git_revision(self) -> t.Optional[str]:
-        try:
-            repo = Repo(self.repo_dir)
-            return repo.head.commit.hexsha
-        except Exception as e:
-            log.warning(f"Couldn't get git revision for: {str(self.repo_dir)}.\n{e}")
-        return None
+    def git_metadata(self, check_dirty: bool = True) -> GitMetadata:
+        """Inspect the repository git state, opening it only once.
+
+        The head is read from the git files when possible, so GitPython (which spawns git
+        subprocesses) is only needed for the dirty check and uncommon repository layouts.
+        """
+        git_head = read_git_head(self.repo_dir)
+        if git_head and not check_dirty:
+            return GitMetadata(revision=git_head.revision, branch=git_head.branch, dirty=None)
 
-    def is_git_dirty(self) -> bool:
         try:
             repo = Repo(self.repo_dir)
-            return repo.is_dirty()
         except Exception as e:
-            log.warning(f"Couldn't check git status for: {str(self.repo_dir)}.\n{e}")
-        return False
+            log.warning(f"Couldn't open git repository: {str(self.repo_dir)}.\n{e}")
+            return GitMetadata(revision="unknown", branch=None, dirty=None)
+
+        if git_head:
+            revision, branch = git_head
+        else:
+            revision = "unknown"
+            try:
+                revision = repo.head.commit.hexsha
+            except Exception as e:
+                log.warning(f"Couldn't get git revision for: {str(self.repo_dir)}.\n{e}")
+
+            try:
+                branch = repo.active_branch.name
+            except TypeError:  # detached HEAD
+                branch = None
+
+        dirty = None
+        if check_dirty:
+            try:
+                dirty = repo.is_dirty()
+            except Exception as e:
+                log.warning(f"Couldn't check git status for: {str(self.repo_dir)}.\n{e}")
+        return GitMetadata(revision=revision, branch=branch, dirty=dirty)
 
 
 def default_lookup_paths() -> list[str]:
     return [str(Path().cwd().parent)]
 
 
+def default_cache_dir() -> Path:
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(xdg_cache_home) / "pulp-docs"
+
+
 class ComponentNav:
     def __init__(self, config: MkDocsConfig, component_slug: Path):
         self._nav_file_name: str = config.plugins["literate-nav"].config.nav_file
@@ -363,31 +583,175 @@ class ComponentNav:
             yield self._dev_index_uri
 
 
-def _render_sitemap(section: Section) -> str:
-    return "<ul>" + _render_sitemap_item(section) + "</ul>"
+def _render_sitemap(section: Section, cache: dict[int, str] | None = None) -> str:
+    """Render the sitemap of section.
+
+    Args:
+        section: The nav section to render.
+        cache: The rendered sections by id, shared by the index pages of a build so that
+            each subtree is only rendered once.
+    """
+    cache = {} if cache is None else cache
+    return "<ul>" + _render_sitemap_item(section, cache) + "</ul>"
 
 
-def _render_sitemap_item(nav_item: Page | Section) -> str:
+def _render_sitemap_item(nav_item: Page | Section, cache: dict[int, str]) -> str:
     if isinstance(nav_item, Page):
         return f'<li><a href="{nav_item.abs_url}">{nav_item.title}</a></li>'
     elif isinstance(nav_item, Section):
+        rendered = cache.get(id(nav_item))
+        if rendered is not None:
+            return rendered
+        rendered = ""
         if nav_item.children:
             title: str = nav_item.title
-            children: str = ""
+            children: list[str] = []
             for item in nav_item.children:
                 if isinstance(item, Page) and item.is_index:
                     title = f'<a href="{item.abs_url}">{title or item.title}</a>'
                 else:
-                    children += _render_sitemap_item(item)
-            return f"<li>{title}<ul>{children}</ul></li>"
-        else:
-            return ""
+                    children.append(_render_sitemap_item(item, cache))
+            rendered = f"<li>{title}<ul>{''.join(children)}</ul></li>"
+        cache[id(nav_item)] = rendered
+        return rendered
     elif isinstance(nav_item, Link):
         return ""
     else:
         raise NotImplementedError(f"Unknown nav item {nav_item}")
 
 
+class ComponentDocs(t.NamedTuple):
+    """The files and navigation collected from a component docs tree.
+
+    Each file entry is a (src_uri, abs_src_path, content, pulp_meta) tuple, where either
+    abs_src_path or content is set.
+    """
+
+    files: list[tuple[Path, Path | None, str | None, dict[str, t.Any] | None]]
+    user_nav: list[t.Any]
+    dev_nav: list[t.Any]
+
+
+def component_docs_dir(comp: LoadedComponent) -> Path:
+    docs_dir = comp.component_dir / "staging_docs"
+    if docs_dir.exists():
+        return docs_dir
+    return comp.component_dir / "docs"
+
+
+def list_docs(docs_dir: Path) -> tuple[list[str], list[Path]]:
+    """Return the files under docs_dir, relative to it, and the directories crawled.
+
+    Symlinked directories are followed, except when they lead to one of their parent
+    directories, which would be a cycle. A directory linked from many places is listed
+    in each of them.
+    """
+    docs_files: list[str] = []
+    docs_dirs: list[Path] = []
+    # each pending directory carries the keys of its parents, to detect cycles in its branch
+    pending = [(str(docs_dir), "", frozenset([_dir_key(os.stat(docs_dir))]))]
+    while pending:
+        dirpath, prefix, parent_dirs = pending.pop()
+        docs_dirs.append(Path(dirpath))
+        subdirs = []
+        with os.scandir(dirpath) as entries:
+            for entry in sorted(entries, key=lambda entry: entry.name):
+                relpath = prefix + entry.name
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    docs_files.append(relpath)
+                    continue
+                dir_key = _dir_key(entry.stat())
+                if dir_key in parent_dirs:
+                    log.warning(
+                        f"Skipping {entry.path}, it links to one of its parent directories."
+                    )
+                    continue
+                subdirs.append((entry.path, relpath + "/", parent_dirs | {dir_key}))
+        # reversed, so subdirs are popped (and listed in the nav) in alphabetical order
+        pending.extend(reversed(subdirs))
+    return docs_files, docs_dirs
+
+
+def _dir_key(stat_result: os.stat_result) -> tuple[int, int]:
+    return stat_result.st_dev, stat_result.st_ino
+
+
+def collect_component_docs(
+    comp: LoadedComponent, config: MkDocsConfig, profiler: BuildProfiler | None = None
+) -> ComponentDocs:
+    profiler = profiler or BuildProfiler(enabled=False)
+    title = comp.spec.title
+    git_url = comp.spec.git_url
+    rest_api = comp.spec.rest_api
+    comp_dir = comp.component_dir
+    repo_dir = comp.repository_dir
+    component_slug = Path(comp_dir.name)
+    component_nav = ComponentNav(config, component_slug)
+    files: list[tuple[Path, Path | None, str | None, dict[str, t.Any] | None]] = []
+
+    log.info(f"Fetching docs from '{comp.spec.title}'.")
+    git_branch = comp.git_branch
+    docs_dir = component_docs_dir(comp)
+    if docs_dir.name == "staging_docs":
+        log.warning(f"Found deprecated 'staging_docs' directory in {comp.spec.path}.")
+    assert docs_dir.exists()
+
+    with profiler.phase("walk_docs", component=comp.component_name):
+        docs_files = comp.docs_files
+        if docs_files is None:
+            docs_files, _ = list_docs(docs_dir)
+        # paths shared by all files are computed once, rather than per file
+        docs_uri = docs_dir.relative_to(comp_dir.parent)
+        special_uris = {
+            "index.md": component_slug / "index.md",
+            "dev/index.md": component_slug / "docs" / "dev" / "index.md",
+        }
+        edit_url = None
+        if git_url and git_branch:
+            edit_url = f"{git_url}/edit/{git_branch}/{docs_dir.relative_to(repo_dir)}"
+        for docs_file in docs_files:
+            abs_src_path = docs_dir / docs_file
+            pulp_meta: dict[str, t.Any] = {}
+            src_uri = special_uris.get(docs_file)
+            if src_uri:
+                pulp_meta["index"] = True
+            else:
+                src_uri = docs_uri / docs_file
+            log.debug(f"Adding {abs_src_path} as {src_uri}.")
+            if edit_url:
+                pulp_meta["edit_url"] = f"{edit_url}/{docs_file}"
+            files.append((src_uri, abs_src_path, None, pulp_meta))
+            component_nav.add(src_uri)
+
+    for src_uri in component_nav.missing_indices():
+        content = MISSING_INDEX_TEMPLATE.format(component=title)
+        files.append((src_uri, None, content, {"index": True}))
+
+    if rest_api:
+        src_uri = component_slug / "restapi.md"
+        content = REST_API_MD.format(component=title)
+        files.append((src_uri, None, content, None))
+        component_nav.add(src_uri)
+        if comp.openapi_spec:
+            # specs are large, so they're copied from disk instead of being held in memory
+            for name, asset_file in api_asset_files(comp.openapi_spec).items():
+                files.append((component_slug / name, asset_file, None, None))
+
+    component_changes = comp_dir / "CHANGES.md"
+    if component_changes.exists():
+        src_uri = component_slug / "changes.md"
+        files.append((src_uri, component_changes, None, None))
+        component_nav.add(src_uri)
+
+    with profiler.phase("component_nav", component=comp.component_name):
+        user_nav, dev_nav = component_nav.user_nav(), component_nav.dev_nav()
+    return ComponentDocs(files=files, user_nav=user_nav, dev_nav=dev_nav)
+
+
 # jinja2 macros and helpers
 
 
@@ -397,13 +761,7 @@ def get_component_data(
     """Generate data for rendering md templates."""
     comp_dir = comp.component_dir
     comp_name = comp.component_name
-
-    github_org = "pulp"
-    try:
-        template_config = comp.component_dir / "template_config.yml"
-        github_org = yaml.safe_load(template_config.read_text())["github_org"]
-    except Exception:
-        pass
+    github_org = comp.github_org
 
     links = []
     if comp.spec.rest_api:
@@ -420,24 +778,13 @@ def get_component_data(
     }
 
 
-def rss_items() -> list:
-    # that's Himdel's rss feed: https://github.com/himdel
-    # TODO move this fetching to js.
-    response = httpx.get("https://himdel.eu/feed/pulp-changes.json")
-    if response.is_error:
-        return [
-            {
-                "url": "#",
-                "title": "Could not fetch the feed. Please, open an issue in https://github.com/pulp/pulp-docs/.",
-            }
-        ]
-
-    rss_feed = json.loads(response.content)
-    return rss_feed["items"][:20]
-
-
 def log_pulp_config(
-    mkdocs_file: str, path: list[str], loaded_components: list[LoadedComponent], site_dir: str
+    mkdocs_file: str,
+    path: list[str],
+    loaded_components: list[LoadedComponent],
+    site_dir: str,
+    openapi_cache: OpenAPISpecCache | None = None,
+    manifest: ComponentManifest | None = None,
 ):
     repo_dir_to_comp_info = defaultdict(list)
     for comp in loaded_components:
@@ -452,10 +799,46 @@ def log_pulp_config(
         "build_output": site_dir,
         "loaded_components": repo_dir_to_comp_info,
     }
+    if openapi_cache:
+        display["openapi_cache"] = {"dir": str(openapi_cache.cache_dir), **openapi_cache.stats()}
+    if manifest:
+        display["manifest"] = {"file": str(manifest.manifest_file), **manifest.stats()}
     display_str = json.dumps(display, indent=4)
     log.info(display_str)
 
 
+class BuildOptions(t.NamedTuple):
+    """The options of the pulp-docs command line, as set in the context variables."""
+
+    blog: bool
+    docstrings: bool
+    draft: bool
+    dryrun: bool
+    path: list[str] | None
+    openapi: bool
+    openapi_jobs: int
+    openapi_shared_env: bool
+    cache_dir: Path | None
+    git_dirty_check: bool
+    profile_build: Path | None
+
+    @classmethod
+    def from_context(cls) -> "BuildOptions":
+        return cls(
+            blog=ctx_blog.get(),
+            docstrings=ctx_docstrings.get(),
+            draft=ctx_draft.get(),
+            dryrun=ctx_dryrun.get(),
+            path=ctx_path.get(),
+            openapi=ctx_openapi.get(),
+            openapi_jobs=ctx_openapi_jobs.get(),
+            openapi_shared_env=ctx_openapi_shared_env.get(),
+            cache_dir=ctx_cache_dir.get(),
+            git_dirty_check=ctx_git_dirty_check.get(),
+            profile_build=ctx_profile_build.get(),
+        )
+
+
 def get_pulpdocs_git_url(config: PulpDocsPluginConfig):
     for component in config.components:
         if component.path == "pulp-docs":
@@ -464,22 +847,74 @@ def get_pulpdocs_git_url(config: PulpDocsPluginConfig):
 
 
 class PulpDocsPlugin(BasePlugin[PulpDocsPluginConfig]):
+    def __init__(self):
+        # State kept between rebuilds of `mkdocs serve`
+        self._load_key: tuple[t.Any, ...] | None = None
+        self._load_result: LoadResult | None = None
+        self._component_docs: dict[Path, ComponentDocs] = {}
+        # Components whose docs changed since their files were listed by the loader
+        self._relisted_comps: set[Path] = set()
+        self._stale_lock = threading.Lock()
+        self._sitemap_cache: dict[int, str] = {}
+        self.rss_feed: RSSFeed | None = None
+        self.profile_file: Path | None = None
+        self.profiler = BuildProfiler(enabled=False)
+        self.options: BuildOptions | None = None
+
+    def on_startup(self, *, command: str, dirty: bool) -> None:
+        # Defining on_startup keeps this instance across `mkdocs serve` rebuilds,
+        # so unchanged components are not reloaded or re-walked.
+        # Rebuilds run in another thread, where the context variables are back to their
+        # defaults, so the options are read once here.
+        self.options = BuildOptions.from_context()
+
     def on_config(self, config: MkDocsConfig) -> MkDocsConfig | None:
         # mkdocs may default to the installation dir
         self.mkdocs_yml_dir = Path(config.docs_dir).parent
         if "site-packages" in config.site_dir:
             config.site_dir = str(Path.cwd() / "site")
 
-        self.blog = ctx_blog.get()
-        self.docstrings = ctx_docstrings.get()
-        self.draft = ctx_draft.get()
-        self.dryrun = ctx_dryrun.get()
+        if self.options is None:
+            self.options = BuildOptions.from_context()
+        options = self.options
+        self.blog = options.blog
+        self.docstrings = options.docstrings
+        self.draft = options.draft
+        self.dryrun = options.dryrun
         self.pulpdocs_git_url = get_pulpdocs_git_url(self.config)
+        self.profile_file = options.profile_build
+        self.profiler = BuildProfiler(enabled=self.profile_file is not None)
 
         # Load components
-        lookup_paths = ctx_path.get() or default_lookup_paths()
-        component_loader = ComponentLoader.from_plugin(self, lookup_paths)
-        load_result = component_loader.load_all(generate_openapi=ctx_openapi.get())
+        lookup_paths = options.path or default_lookup_paths()
+        self.cache_dir = options.cache_dir or default_cache_dir()
+        # The feed is fetched while the build runs, instead of when the macro renders
+        if self.rss_feed is None:
+            self.rss_feed = RSSFeed(RSS_FEED_URL, self.cache_dir / "rss" / "feed.json")
+        self.rss_feed.start()
+        component_loader = ComponentLoader.from_plugin(
+            self,
+            lookup_paths,
+            cache_dir=self.cache_dir,
+            openapi_jobs=options.openapi_jobs,
+            openapi_shared_env=options.openapi_shared_env,
+            check_git_dirty=options.git_dirty_check,
+            profiler=self.profiler,
+        )
+        # Rebuilds with the same components reuse the previous result (e.g, on serve).
+        load_key = (
+            tuple(map(dict, self.config.components)),
+            tuple(lookup_paths),
+            options.openapi,
+        )
+        if load_key == self._load_key and self._load_result:
+            load_result = self._load_result
+        else:
+            load_result = component_loader.load_all(generate_openapi=options.openapi)
+            self._load_key, self._load_result = load_key, load_result
+            with self._stale_lock:
+                self._component_docs.clear()
+                self._relisted_comps.clear()
         if load_result.missing and not self.draft:
             missing_names = sorted([p.component_name for p in load_result.missing])
             raise PluginError(
@@ -488,20 +923,27 @@ class PulpDocsPlugin(BasePlugin[PulpDocsPluginConfig]):
         self.loaded_comps = load_result.loaded
 
         mkdocs_file = self.mkdocs_yml_dir / "mkdocs.yml"
-        log_pulp_config(mkdocs_file, lookup_paths, self.loaded_comps, config.site_dir)
+        log_pulp_config(
+            mkdocs_file,
+            lookup_paths,
+            self.loaded_comps,
+            config.site_dir,
+            openapi_cache=component_loader.openapi_cache,
+            manifest=component_loader.manifest,
+        )
 
         # Configure mkdocs plugins
         mkdocstrings_config = config.plugins["mkdocstrings"].config
         components_var = []
         for component in self.loaded_comps:
             components_var.append(get_component_data(component))
-            config.watch.append(str(component.component_dir / "docs"))
+            config.watch.append(str(component_docs_dir(component)))
             component_dir = component.component_dir.resolve()
             mkdocstrings_config.handlers["python"]["paths"].append(str(component_dir))
             mkdocstrings_config.handlers["python"]["paths"].append(str(component_dir / "src"))
 
         macros_plugin = config.plugins["macros"]
-        macros_plugin.register_macros({"rss_items": rss_items})
+        macros_plugin.register_macros({"rss_items": self.rss_feed.items})
         macros_plugin.register_variables({"components": components_var})
 
         blog_plugin = config.plugins["material/blog"]
@@ -511,87 +953,76 @@ class PulpDocsPlugin(BasePlugin[PulpDocsPluginConfig]):
         mkdocstrings_plugin.config["enabled"] = self.docstrings
 
         if self.dryrun is True:
+            self._write_profile()
             log.info("Stopping: dry-run in enabled")
             sys.exit(0)
 
         return config
 
+    def on_serve(self, server: LiveReloadServer, /, *, config: MkDocsConfig, builder):
+        # Track which component changed, so rebuilds only re-collect its docs.
+        # The handlers run on the server's observer, before the rebuild is triggered.
+        for comp in self.loaded_comps:
+            handler = FileSystemEventHandler()
+            handler.on_any_event = partial(self._on_component_change, comp.component_dir)
+            server.observer.schedule(handler, str(component_docs_dir(comp)), recursive=True)
+        return server
+
+    def _on_component_change(self, component_dir: Path, event: FileSystemEvent):
+        if event.event_type in ("opened", "closed_no_write"):
+            return
+        with self._stale_lock:
+            self._component_docs.pop(component_dir, None)
+            self._relisted_comps.add(component_dir)
+
     def on_files(self, files: Files, /, *, config: MkDocsConfig) -> Files | None:
+        with self.profiler.phase("on_files"):
+            return self._add_component_files(files, config)
+
+    def _add_component_files(self, files: Files, config: MkDocsConfig) -> Files:
         log.info(f"Loading Pulp components: {self.loaded_comps}")
         user_nav: dict[str, t.Any] = {}
         dev_nav: dict[str, t.Any] = {}
+        with self._stale_lock:
+            stale_comps = [
+                replace(comp, docs_files=None)
+                if comp.component_dir in self._relisted_comps
+                else comp
+                for comp in self.loaded_comps
+                if comp.component_dir not in self._component_docs
+            ]
+        # The docs of each component are crawled in their own thread
+        collect = partial(collect_component_docs, config=config, profiler=self.profiler)
+        with ThreadPoolExecutor() as executor:
+            collected = list(executor.map(collect, stale_comps))
+        with self._stale_lock:
+            for comp, comp_docs in zip(stale_comps, collected):
+                self._component_docs[comp.component_dir] = comp_docs
+            component_docs = dict(self._component_docs)
+
         for comp in self.loaded_comps:
-            title = comp.spec.title
-            kind = comp.spec.kind
-            git_url = comp.spec.git_url
-            rest_api = comp.spec.rest_api
-            comp_dir = comp.component_dir
-            repo_dir = comp.repository_dir
-            component_slug = Path(comp_dir.name)
-            component_nav = ComponentNav(config, component_slug)
-
-            log.info(f"Fetching docs from '{comp.spec.title}'.")
-            try:
-                git_branch = Repo(repo_dir).active_branch.name
-            except TypeError:
-                git_branch = None
-            docs_dir = comp_dir / "staging_docs"
-            if docs_dir.exists():
-                log.warning(f"Found deprecated 'staging_docs' directory in {comp.spec.path}.")
-            else:
-                docs_dir = comp_dir / "docs"
-            assert docs_dir.exists()
-
-            for dirpath, dirnames, filenames in os.walk(docs_dir, followlinks=True):
-                for filename in filenames:
-                    abs_src_path = Path(dirpath) / filename
-                    pulp_meta: dict[str, t.Any] = {}
-                    if abs_src_path == docs_dir / "index.md":
-                        src_uri = component_slug / "index.md"
-                        pulp_meta["index"] = True
-                    elif abs_src_path == docs_dir / "dev" / "index.md":
-                        src_uri = component_slug / "docs" / "dev" / "index.md"
-                        pulp_meta["index"] = True
-                    else:
-                        src_uri = abs_src_path.relative_to(comp_dir.parent)
-                    log.debug(f"Adding {abs_src_path} as {src_uri}.")
-                    if git_url and git_branch:
-                        git_relpath = abs_src_path.relative_to(repo_dir)
-                        pulp_meta["edit_url"] = f"{git_url}/edit/{git_branch}/{git_relpath}"
+            comp_docs = component_docs[comp.component_dir]
+            for src_uri, abs_src_path, content, pulp_meta in comp_docs.files:
+                if abs_src_path:
                     new_file = File.generated(config, src_uri, abs_src_path=abs_src_path)
+                else:
+                    new_file = File.generated(config, src_uri, content=content)
+                if pulp_meta is not None:
                     new_file.pulp_meta = pulp_meta
-                    files.append(new_file)
-                    component_nav.add(src_uri)
-
-            for src_uri in component_nav.missing_indices():
-                content = MISSING_INDEX_TEMPLATE.format(component=title)
-                new_file = File.generated(config, str(src_uri), content=content)
-                new_file.pulp_meta = {"index": True}
                 files.append(new_file)
 
-            if rest_api:
-                src_uri = component_slug / "restapi.md"
-                content = REST_API_MD.format(component=title)
-                files.append(File.generated(config, src_uri, content=content))
-                component_nav.add(src_uri)
-                if comp.openapi_spec:
-                    api_json_content = comp.openapi_spec.read_text()
-                    src_uri = (comp_dir / "api.json").relative_to(comp_dir.parent)
-                    files.append(File.generated(config, src_uri, content=api_json_content))
-
-            component_changes = comp_dir / "CHANGES.md"
-            if component_changes.exists():
-                src_uri = component_slug / "changes.md"
-                files.append(File.generated(config, src_uri, abs_src_path=component_changes))
-                component_nav.add(src_uri)
-
-            user_nav.setdefault(kind, []).append({title: component_nav.user_nav()})
-            dev_nav.setdefault(kind, []).append({title: component_nav.dev_nav()})
+            kind, title = comp.spec.kind, comp.spec.title
+            user_nav.setdefault(kind, []).append({title: deepcopy(comp_docs.user_nav)})
+            dev_nav.setdefault(kind, []).append({title: deepcopy(comp_docs.dev_nav)})
 
         config.nav[1]["User Manual"].extend([{key: value} for key, value in user_nav.items()])
         config.nav[2]["Developer Manual"].extend([{key: value} for key, value in dev_nav.items()])
         return files
 
+    def on_nav(self, nav: Navigation, /, *, config: MkDocsConfig, files: Files) -> None:
+        # The sitemaps rendered for the previous build's nav are stale
+        self._sitemap_cache = {}
+
     def on_page_context(
         self,
         context: TemplateContext,
@@ -599,19 +1030,22 @@ class PulpDocsPlugin(BasePlugin[PulpDocsPluginConfig]):
         config: MkDocsConfig,
         nav: Navigation,
     ) -> TemplateContext:
-        pulp_meta = getattr(page.file, "pulp_meta", {})
-        if pulp_meta.get("index"):
-            toc = (
-                "<ul>"
-                + "".join((f"<li>{item.title}</li>" for item in page.parent.children))
-                + "</li>"
-            )
-            toc = '<div class="pulp-sitemap">' + _render_sitemap(page.parent) + "</div>"
-            page.content = page.content.replace("PULP_SITEMAP", toc)
+        with self.profiler.phase("on_page_context", page=page.file.src_uri):
+            self._render_page_sitemap(page)
 
         # TODO adjust the repository link to the current plugin.
         return context
 
+    def _render_page_sitemap(self, page: Page):
+        pulp_meta = getattr(page.file, "pulp_meta", {})
+        if pulp_meta.get("index"):
+            # the placeholder is appended by on_page_markdown, so it's searched from the end
+            head, placeholder, tail = page.content.rpartition(SITEMAP_PLACEHOLDER)
+            if not placeholder:
+                return
+            sitemap = _render_sitemap(page.parent, self._sitemap_cache)
+            page.content = f'{head}<div class="pulp-sitemap">{sitemap}</div>{tail}'
+
     def on_page_markdown(
         self,
         markdown: str,
@@ -619,9 +1053,10 @@ class PulpDocsPlugin(BasePlugin[PulpDocsPluginConfig]):
         config: MkDocsConfig,
         files: Files,
     ) -> str:
-        pulp_meta = getattr(page.file, "pulp_meta", {})
-        if pulp_meta.get("index"):
-            markdown += "\n\n---\n\n## Site Map\n\nPULP_SITEMAP"
+        with self.profiler.phase("on_page_markdown", page=page.file.src_uri):
+            pulp_meta = getattr(page.file, "pulp_meta", {})
+            if pulp_meta.get("index"):
+                markdown += f"\n\n---\n\n## Site Map\n\n{SITEMAP_PLACEHOLDER}"
         return markdown
 
     def on_pre_page(
@@ -630,7 +1065,17 @@ class PulpDocsPlugin(BasePlugin[PulpDocsPluginConfig]):
         config: MkDocsConfig,
         files: Files,
     ) -> Page | None:
-        pulp_meta = getattr(page.file, "pulp_meta", {})
-        if edit_url := pulp_meta.get("edit_url"):
-            page.edit_url = edit_url
+        with self.profiler.phase("on_pre_page", page=page.file.src_uri):
+            pulp_meta = getattr(page.file, "pulp_meta", {})
+            if edit_url := pulp_meta.get("edit_url"):
+                page.edit_url = edit_url
         return page
+
+    def on_post_build(self, *, config: MkDocsConfig) -> None:
+        self._write_profile()
+
+    def _write_profile(self):
+        if self.profile_file is None:
+            return
+        self.profiler.write(self.profile_file)
+        log.info(f"Build profile written to: {self.profile_file}")
@@ -0,0 +1,109 @@
+"""
+Module for profiling the build phases of the PulpDocs plugin.
+
+The result is written in the Chrome trace event format, which can be inspected with
+chrome://tracing or https://ui.perfetto.dev.
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+import typing as t
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+
+class _OpenPhase:
+    def __init__(self, name: str, args: dict[str, t.Any]):
+        self.name = name
+        self.args = args
+        self.start_ns = time.perf_counter_ns()
+        self.start_memory = 0
+        self.peak_memory = 0
+
+
+class BuildProfiler:
+    """Record wall time and peak memory of build phases.
+
+    Phases can be nested and run from many threads. As memory is traced for the whole
+    process, the peak memory of a phase includes allocations of concurrent phases.
+
+    Args:
+        enabled: Whether to record anything. When disabled, phases are no-ops.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.events: list[dict[str, t.Any]] = []
+        self._open_phases: list[_OpenPhase] = []
+        self._lock = threading.Lock()
+        self._start_ns = time.perf_counter_ns()
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def phase(self, name: str, **args: t.Any) -> t.ContextManager[None]:
+        """Return a context manager that records the enclosed block as a phase."""
+        if not self.enabled:
+            return nullcontext()
+        return self._phase(name, args)
+
+    @contextmanager
+    def _phase(self, name: str, args: dict[str, t.Any]) -> t.Iterator[None]:
+        phase = _OpenPhase(name, args)
+        with self._lock:
+            phase.start_memory = self._update_peaks()
+            self._open_phases.append(phase)
+        try:
+            yield
+        finally:
+            end_ns = time.perf_counter_ns()
+            with self._lock:
+                end_memory = self._update_peaks()
+                self._open_phases.remove(phase)
+                self.events.append(self._trace_event(phase, end_ns, end_memory))
+
+    def _update_peaks(self) -> int:
+        """Propagate the peak since the last update to all open phases and reset it."""
+        current, peak = tracemalloc.get_traced_memory()
+        for phase in self._open_phases:
+            phase.peak_memory = max(phase.peak_memory, peak)
+        tracemalloc.reset_peak()
+        return current
+
+    def _trace_event(self, phase: _OpenPhase, end_ns: int, end_memory: int) -> dict[str, t.Any]:
+        return {
+            "name": phase.name,
+            "ph": "X",
+            "ts": (phase.start_ns - self._start_ns) / 1000,
+            "dur": (end_ns - phase.start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {
+                **phase.args,
+                "peak_memory_kb": max(phase.peak_memory, end_memory) // 1024,
+                "memory_delta_kb": (end_memory - phase.start_memory) // 1024,
+            },
+        }
+
+    def totals(self) -> dict[str, dict[str, float]]:
+        """Return the accumulated duration (ms) and count of each phase name."""
+        totals: dict[str, dict[str, float]] = defaultdict(lambda: {"duration_ms": 0, "count": 0})
+        for event in self.events:
+            totals[event["name"]]["duration_ms"] += event["dur"] / 1000
+            totals[event["name"]]["count"] += 1
+        return dict(totals)
+
+    def write(self, output_file: Path) -> None:
+        """Write the recorded phases as a Chrome trace file."""
+        with self._lock:
+            events = sorted(self.events, key=lambda e: e["ts"])
+        trace = {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"totals": self.totals()},
+        }
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        output_file.write_text(json.dumps(trace, indent=2))
@@ -0,0 +1,122 @@
+"""
+Module for fetching the RSS feed shown in the docs without blocking the build.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import typing as t
+from pathlib import Path
+
+import httpx
+from mkdocs.plugins import get_plugin_logger
+
+log = get_plugin_logger(__name__)
+
+# that's Himdel's rss feed: https://github.com/himdel
+RSS_FEED_URL = "https://himdel.eu/feed/pulp-changes.json"
+RSS_FEED_VERSION = 1
+RSS_MAX_ITEMS = 20
+
+FEED_UNAVAILABLE = [
+    {
+        "url": "#",
+        "title": "Could not fetch the feed. Please, open an issue in https://github.com/pulp/pulp-docs/.",
+    }
+]
+
+
+class RSSFeed:
+    """A json feed fetched in the background and cached on disk.
+
+    The cached copy is served while it's younger than ttl. Older copies are revalidated
+    with ETag/If-Modified-Since, and are still served if the feed can't be fetched.
+
+    Args:
+        url: The url of the json feed.
+        cache_file: Where the last good copy of the feed is stored.
+        ttl: Seconds a cached copy is used without revalidating it.
+        timeout: Seconds to wait for the feed server.
+    """
+
+    def __init__(self, url: str, cache_file: Path, ttl: float = 3600, timeout: float = 10):
+        self.url = url
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.timeout = timeout
+        self._cached = self._load()
+        self._lock = threading.Lock()
+        self._fetch_thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Fetch the feed in a background thread, unless the cached copy is fresh."""
+        with self._lock:
+            if self._fetch_thread and self._fetch_thread.is_alive():
+                return
+            if self._is_fresh():
+                return
+            self._fetch_thread = threading.Thread(target=self._fetch, daemon=True)
+            self._fetch_thread.start()
+
+    def items(self, wait: float | None = None) -> list[dict[str, t.Any]]:
+        """Return the feed items, waiting for an ongoing fetch for up to wait seconds."""
+        with self._lock:
+            fetch_thread = self._fetch_thread
+        if fetch_thread:
+            fetch_thread.join(self.timeout if wait is None else wait)
+        with self._lock:
+            cached = self._cached
+        if cached is None:
+            return FEED_UNAVAILABLE
+        return cached["items"][:RSS_MAX_ITEMS]
+
+    def _fetch(self) -> None:
+        with self._lock:
+            cached = self._cached
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        try:
+            response = httpx.get(self.url, headers=headers, timeout=self.timeout)
+            if response.status_code == httpx.codes.NOT_MODIFIED and cached:
+                fetched = {**cached, "fetched_at": time.time()}
+            else:
+                response.raise_for_status()
+                fetched = {
+                    "items": response.json()["items"],
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "fetched_at": time.time(),
+                }
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            log.warning(f"Could not fetch the RSS feed from {self.url}: {e}")
+            return
+        with self._lock:
+            self._cached = fetched
+        self._save(fetched)
+
+    def _is_fresh(self) -> bool:
+        return self._cached is not None and time.time() - self._cached["fetched_at"] < self.ttl
+
+    def _load(self) -> dict[str, t.Any] | None:
+        try:
+            data = json.loads(self.cache_file.read_text())
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != RSS_FEED_VERSION:
+            return None
+        return data["feed"]
+
+    def _save(self, feed: dict[str, t.Any]) -> None:
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.cache_file.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as tmp_file:
+                json.dump({"version": RSS_FEED_VERSION, "feed": feed}, tmp_file)
+            os.replace(tmp_name, self.cache_file)
+        except OSError as e:
+            log.warning(f"Could not cache the RSS feed: {e}")
@@ -0,0 +1,166 @@
+import math
+import os
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+import pytest
+import yaml
+
+# Scales of the synthetic corpus, relative to the current size of the Pulp docs
+BENCH_SCALES = [int(s) for s in os.environ.get("PULPDOCS_BENCH_SCALES", "10,100").split(",")]
+
+PERSONAS = ("user", "admin", "dev")
+TAXONOMIES = ("tutorials", "guides", "learn", "reference")
+FAKE_SHA = "0123456789abcdef0123456789abcdef01234567"
+
+
+class CorpusSpec(NamedTuple):
+    components: int
+    docs_files: int
+    depth: int
+    changes_lines: int
+
+    def scaled(self, factor: int) -> "CorpusSpec":
+        """Scale the corpus size by factor, growing both components and their docs."""
+        k = math.sqrt(factor)
+        return CorpusSpec(
+            components=round(self.components * k),
+            docs_files=round(self.docs_files * k),
+            depth=self.depth,
+            changes_lines=round(self.changes_lines * k),
+        )
+
+
+# Roughly the size of the Pulp docs corpus today
+BASE_CORPUS = CorpusSpec(components=25, docs_files=50, depth=3, changes_lines=1500)
+
+
+class Corpus(NamedTuple):
+    basedir: Path
+    spec: CorpusSpec
+    mkdocs_file: Path
+    component_names: list[str]
+
+
+class BenchResult(NamedTuple):
+    name: str
+    scale: int
+    seconds: float
+
+
+bench_results_key = pytest.StashKey[list[BenchResult]]()
+
+
+def generate_corpus(basedir: Path, spec: CorpusSpec) -> Corpus:
+    """Write synthetic component repositories and a mkdocs.yml that registers them."""
+    names = [f"pulp_bench{c}" for c in range(spec.components)]
+    for c, name in enumerate(names):
+        repo_dir = basedir / name
+        write_fake_git(repo_dir)
+        (repo_dir / "pyproject.toml").write_text('[project]\nversion = "1.0.0"\n')
+        other_component = names[(c + 1) % len(names)]
+        write_docs(repo_dir, name, other_component, spec)
+        write_changes(repo_dir, name, spec)
+
+    components = [
+        {
+            "title": name,
+            "path": name,
+            "git_url": f"https://github.com/pulp/{name}",
+            "kind": "Content",
+        }
+        for name in names
+    ]
+    mkdocs = {
+        "site_name": "Benchmark",
+        "nav": [{"Home": "index.md"}, {"User Manual": []}, {"Developer Manual": []}],
+        "plugins": ["literate-nav", {"PulpDocs": {"components": components}}],
+    }
+    mkdocs_file = basedir / "pulp-docs" / "mkdocs.yml"
+    (mkdocs_file.parent / "docs").mkdir(parents=True)
+    (mkdocs_file.parent / "docs" / "index.md").write_text("# Home")
+    mkdocs_file.write_text(yaml.safe_dump(mkdocs, sort_keys=False))
+    return Corpus(basedir=basedir, spec=spec, mkdocs_file=mkdocs_file, component_names=names)
+
+
+def write_fake_git(repo_dir: Path):
+    """Write just enough of a .git dir for HEAD to be read without git."""
+    heads_dir = repo_dir / ".git" / "refs" / "heads"
+    heads_dir.mkdir(parents=True)
+    (repo_dir / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+    (heads_dir / "main").write_text(f"{FAKE_SHA}\n")
+
+
+def write_docs(repo_dir: Path, name: str, other_component: str, spec: CorpusSpec):
+    docs_dir = repo_dir / "docs"
+    paths = [Path("index.md"), Path("dev", "index.md")]
+    for i in range(spec.docs_files):
+        persona = PERSONAS[i % len(PERSONAS)]
+        taxonomy = TAXONOMIES[(i // len(PERSONAS)) % len(TAXONOMIES)]
+        nesting = [f"level{d}" for d in range(i % spec.depth)]
+        paths.append(Path(persona, taxonomy, *nesting, f"page{i}.md"))
+
+    for i, path in enumerate(paths):
+        previous = paths[i - 1].with_suffix("")
+        broken = f"\n[broken](site:{name}/docs/missing{i})" if i % 10 == 0 else ""
+        content = (
+            f"# Page {i}\n\n"
+            f"Some text about [the previous page](site:{name}/docs/{previous}).\n"
+            f"See also [another component](site:{other_component}/docs/index.md).\n"
+            "\n```bash\n$ pulp --help\n```\n"
+            f"{broken}\n"
+        )
+        (docs_dir / path).parent.mkdir(parents=True, exist_ok=True)
+        (docs_dir / path).write_text(content)
+
+
+def write_changes(repo_dir: Path, name: str, spec: CorpusSpec):
+    lines = ["# Changelog", ""]
+    for i in range(spec.changes_lines):
+        if i % 20 == 0:
+            lines.extend(["", f"## 1.{i // 20}.0 (2025-01-01)", ""])
+        lines.append(f"- Fixed issue [#{i}](site:{name}/docs/index.md) in some part of the code.")
+    (repo_dir / "CHANGES.md").write_text("\n".join(lines))
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc):
+    if "scale" in metafunc.fixturenames:
+        ids = [f"{scale}x" for scale in BENCH_SCALES]
+        metafunc.parametrize("scale", BENCH_SCALES, ids=ids, scope="session")
+
+
+def pytest_configure(config: pytest.Config):
+    config.stash[bench_results_key] = []
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config: pytest.Config):
+    results = config.stash.get(bench_results_key, [])
+    if not results:
+        return
+    terminalreporter.section("benchmark results (best of rounds)")
+    for result in results:
+        terminalreporter.write_line(
+            f"{result.name:<24} {result.scale:>5}x {result.seconds * 1000:>12.1f} ms"
+        )
+
+
+@pytest.fixture(scope="session")
+def corpus(scale: int, tmp_path_factory: pytest.TempPathFactory) -> Corpus:
+    basedir = tmp_path_factory.mktemp(f"corpus-{scale}x")
+    return generate_corpus(basedir, BASE_CORPUS.scaled(scale))
+
+
+@pytest.fixture
+def bench(request: pytest.FixtureRequest, scale: int) -> Callable[..., None]:
+    results = request.config.stash[bench_results_key]
+
+    def _bench(name: str, func: Callable[[], object], rounds: int = 3):
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        results.append(BenchResult(name=name, scale=scale, seconds=min(timings)))
+
+    return _bench
@@ -0,0 +1,101 @@
+import contextlib
+import io
+from copy import deepcopy
+from pathlib import Path
+
+import pytest
+from mkdocs.config import load_config
+from mkdocs.config.defaults import MkDocsConfig
+from mkdocs.structure.files import Files
+from mkdocs.structure.nav import Section, get_navigation
+
+from linkchecker.cli import linkchecker
+from pulp_docs.plugin import ComponentLoader, ComponentNav, PulpDocsPlugin, _render_sitemap
+
+from .conftest import Corpus
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture
+def mkdocs_config(corpus: Corpus) -> MkDocsConfig:
+    return load_config(str(corpus.mkdocs_file), site_dir=str(corpus.basedir / "site"))
+
+
+@pytest.fixture
+def plugin(corpus: Corpus, mkdocs_config: MkDocsConfig) -> PulpDocsPlugin:
+    plugin = mkdocs_config.plugins["PulpDocs"]
+    loader = ComponentLoader.from_plugin(plugin, [str(corpus.basedir)], check_git_dirty=False)
+    plugin.loaded_comps = loader.load_all().loaded
+    plugin._component_docs.clear()
+    return plugin
+
+
+def run_on_files(plugin: PulpDocsPlugin, config: MkDocsConfig, nav: list) -> Files:
+    plugin._component_docs.clear()
+    config.nav = deepcopy(nav)
+    return config.plugins.on_files(Files([]), config=config)
+
+
+def test_load_all(corpus: Corpus, plugin: PulpDocsPlugin, bench):
+    def load_all():
+        loader = ComponentLoader.from_plugin(plugin, [str(corpus.basedir)], check_git_dirty=False)
+        return loader.load_all()
+
+    bench("load_all", load_all)
+
+
+def test_on_files(plugin: PulpDocsPlugin, mkdocs_config: MkDocsConfig, bench):
+    nav = deepcopy(mkdocs_config.nav)
+    bench("on_files", lambda: run_on_files(plugin, mkdocs_config, nav))
+
+
+def test_component_nav(plugin: PulpDocsPlugin, mkdocs_config: MkDocsConfig, bench):
+    run_on_files(plugin, mkdocs_config, deepcopy(mkdocs_config.nav))
+    component_uris = [
+        (Path(comp_dir.name), [Path(f[0]) for f in comp_docs.files])
+        for comp_dir, comp_docs in plugin._component_docs.items()
+    ]
+
+    def build_navs():
+        for component_slug, uris in component_uris:
+            component_nav = ComponentNav(mkdocs_config, component_slug)
+            for uri in uris:
+                component_nav.add(uri)
+            component_nav.user_nav()
+            component_nav.dev_nav()
+
+    bench("component_nav", build_navs)
+
+
+def test_render_sitemap(plugin: PulpDocsPlugin, mkdocs_config: MkDocsConfig, bench):
+    files = run_on_files(plugin, mkdocs_config, deepcopy(mkdocs_config.nav))
+    navigation = get_navigation(files, mkdocs_config)
+    sections = []
+    pending = list(navigation.items)
+    while pending:
+        item = pending.pop()
+        if isinstance(item, Section):
+            sections.append(item)
+            pending.extend(item.children)
+
+    def render_sitemaps():
+        # a build shares the cache between all of its index pages
+        cache: dict[int, str] = {}
+        return [_render_sitemap(section, cache) for section in sections]
+
+    bench("render_sitemap", render_sitemaps)
+
+
+def test_linkchecker(corpus: Corpus, bench):
+    component_files = [
+        (str(corpus.basedir / name), [str(f) for f in (corpus.basedir / name).rglob("*.md")])
+        for name in corpus.component_names
+    ]
+
+    def check_all():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for component_dir, files in component_files:
+                linkchecker(component_dir, files)
+
+    bench("linkchecker", check_all, rounds=1)
@@ -2,7 +2,7 @@ import json
 
 import pytest
 
-from pulp_docs.openapi import annotate_api_json
+from pulp_docs.openapi import annotate_api_json, annotate_api_json_file
 
 
 def make_spec(versions: dict | None = None, description: str = "") -> str:
@@ -55,3 +55,62 @@ def test_annotate(initial_description, versions, expected_description):
     )
     assert result["info"]["description"] == expected_description
     assert "title" not in result["info"]
+
+
+def test_annotate_component():
+    """Specs from a shared environment only show the versions of their component and core."""
+    spec = make_spec(versions={"core": "3.70", "file": "1.5", "rpm": "3.2"})
+    result = json.loads(annotate_api_json(spec, component="rpm"))
+    assert result["info"]["description"] == "Generated from: pulp_rpm 3.2 (pulpcore 3.70)"
+    result = json.loads(annotate_api_json(spec, component="core"))
+    assert result["info"]["description"] == "Generated from: pulpcore 3.70"
+
+
+INFO = {"title": "Pulp 3 API", "x-pulp-app-versions": {"core": "3.70"}}
+PATHS = {
+    "/pulp/api/v3/": {"get": {"description": 'Braces } { and quotes \\" in strings', "info": []}}
+}
+
+
+@pytest.mark.parametrize(
+    "members",
+    [
+        pytest.param({"openapi": "3.0.3", "info": INFO, "paths": PATHS}, id="info-first"),
+        pytest.param({"openapi": "3.0.3", "paths": PATHS, "info": INFO}, id="info-last"),
+    ],
+)
+def test_annotate_keeps_the_rest_of_the_spec(members: dict):
+    api_json = json.dumps(members, indent=2)
+    info_json = json.dumps(INFO, indent=2).replace("\n", "\n  ")
+    prefix, _, suffix = api_json.partition(info_json)
+
+    result = annotate_api_json(api_json)
+    assert result.startswith(prefix)
+    assert result.endswith(suffix)
+    new_info = result.removeprefix(prefix).removesuffix(suffix)
+    assert "\n" not in new_info
+    assert json.loads(new_info)["description"] == "Generated from: pulpcore 3.70"
+
+
+@pytest.mark.parametrize(
+    "api_json",
+    [
+        pytest.param(json.dumps({"paths": {"info": INFO}}), id="nested-info"),
+        pytest.param(json.dumps({"info": "not an object"}), id="info-string"),
+        pytest.param(json.dumps({"info": None, "paths": {}}), id="info-null"),
+        pytest.param(json.dumps({"info": {"title": "no versions"}}), id="no-versions"),
+    ],
+)
+def test_annotate_unchanged(api_json: str):
+    assert annotate_api_json(api_json) == api_json
+
+
+def test_annotate_file(tmp_path):
+    spec = {"openapi": "3.0.3", "info": {**INFO, "description": "Ünïcode"}, "paths": PATHS}
+    spec_file = tmp_path / "api.json"
+    spec_file.write_text(json.dumps(spec, indent=2))
+    annotate_api_json_file(spec_file)
+    result = json.loads(spec_file.read_text())
+    assert result["info"]["description"] == "Ünïcode\n\nGenerated from: pulpcore 3.70"
+    assert result["paths"] == PATHS
+    assert list(tmp_path.iterdir()) == [spec_file]
@@ -0,0 +1,102 @@
+from collections import Counter
+
+import pytest
+from git import Repo
+
+from pulp_docs.plugin import ComponentLoader, ComponentSpec, DataExtractor, GitMetadata
+
+TREE = """
+=== pulpcore/pyproject.toml
+[project]
+version = "3.0.0"
+=== pulpcore/pulp_file/pyproject.toml
+[project]
+version = "3.0.0"
+=== pulp_rpm/pyproject.toml
+[project]
+version = "1.0.0"
+"""
+
+
+def make_spec(path: str) -> ComponentSpec:
+    return ComponentSpec.validate({"path": path, "title": path, "kind": "Content"})
+
+
+@pytest.fixture
+def git_calls(monkeypatch) -> Counter:
+    calls: Counter = Counter()
+
+    def git_metadata(self, check_dirty=True):
+        calls[self.repo_dir.name] += 1
+        return GitMetadata(
+            revision=f"sha-{self.repo_dir.name}", branch="main", dirty=True if check_dirty else None
+        )
+
+    monkeypatch.setattr(DataExtractor, "git_metadata", git_metadata)
+    return calls
+
+
+def test_load_all(create_tree, git_calls: Counter):
+    """Components keep the spec order and each repository is inspected once."""
+    basedir, _ = create_tree(TREE)
+    paths = ["pulp_rpm", "pulpcore", "pulp_missing", "pulpcore/pulp_file"]
+    loader = ComponentLoader([str(basedir)], [make_spec(path) for path in paths])
+    result = loader.load_all()
+
+    assert [c.spec.path for c in result.loaded] == ["pulp_rpm", "pulpcore", "pulpcore/pulp_file"]
+    assert [c.path for c in result.missing] == ["pulp_missing"]
+    assert [c.git_revision for c in result.loaded] == [
+        "sha-pulp_rpm",
+        "sha-pulpcore",
+        "sha-pulpcore",
+    ]
+    assert git_calls == {"pulpcore": 1, "pulp_rpm": 1}
+
+
+def test_load_all_without_dirty_check(create_tree, git_calls: Counter):
+    basedir, _ = create_tree(TREE)
+    loader = ComponentLoader([str(basedir)], [make_spec("pulpcore")], check_git_dirty=False)
+    (component,) = loader.load_all().loaded
+    assert component.git_dirty is None
+    assert component.git_branch == "main"
+
+
+def test_load_all_git_failure_does_not_hang(create_tree, monkeypatch):
+    """A failed inspection is raised for every component of the repository."""
+    basedir, _ = create_tree(TREE)
+
+    def git_metadata(self, check_dirty=True):
+        raise RuntimeError("broken repository")
+
+    monkeypatch.setattr(DataExtractor, "git_metadata", git_metadata)
+    specs = [make_spec("pulpcore"), make_spec("pulpcore/pulp_file")]
+    loader = ComponentLoader([str(basedir)], specs)
+    with pytest.raises(RuntimeError, match="broken repository"):
+        loader.load_all()
+
+
+def test_git_metadata(tmp_path):
+    repo = Repo.init(tmp_path, initial_branch="main")
+    (tmp_path / "file.txt").write_text("content")
+    repo.index.add(["file.txt"])
+    commit = repo.index.commit("initial")
+    extractor = DataExtractor(tmp_path, tmp_path)
+
+    assert extractor.git_metadata() == GitMetadata(
+        revision=commit.hexsha, branch="main", dirty=False
+    )
+    (tmp_path / "file.txt").write_text("changed")
+    assert extractor.git_metadata().dirty is True
+    assert extractor.git_metadata(check_dirty=False).dirty is None
+
+    repo.head.reference = commit
+    assert extractor.git_metadata().branch is None
+
+
+def test_github_org_of_nested_component(create_tree, git_calls: Counter):
+    """The template config is read from where the component is in its repository."""
+    basedir, _ = create_tree(TREE)
+    (basedir / "pulpcore/pulp_file/template_config.yml").write_text("github_org: file-org")
+    loader = ComponentLoader([str(basedir)], [make_spec("pulpcore/pulp_file")])
+    (component,) = loader.load_all().loaded
+    assert component.github_org == "file-org"
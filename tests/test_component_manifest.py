@@ -0,0 +1,111 @@
+from pathlib import Path
+
+import pytest
+from git import Repo
+
+from pulp_docs.manifest import ComponentManifest
+from pulp_docs.plugin import ComponentLoader, ComponentSpec, DataExtractor
+
+TREE = """
+=== pulp_rpm/pyproject.toml
+[project]
+version = "1.0.0"
+=== pulp_rpm/docs/index.md
+# Index
+=== pulp_rpm/docs/user/guides/sync.md
+# Sync
+"""
+
+
+@pytest.fixture
+def repo(create_tree) -> Repo:
+    basedir, _ = create_tree(TREE)
+    repo = Repo.init(basedir / "pulp_rpm", initial_branch="main")
+    repo.git.add(".")
+    repo.index.commit("initial")
+    return repo
+
+
+@pytest.fixture
+def discoveries(monkeypatch) -> list[str]:
+    """Record the components whose version was read, which only happens on discovery."""
+    calls = []
+    package_version = DataExtractor.package_version
+
+    def recording_package_version(self):
+        calls.append(self.comp_dir.name)
+        return package_version(self)
+
+    monkeypatch.setattr(DataExtractor, "package_version", recording_package_version)
+    return calls
+
+
+def load(repo: Repo, cache_dir: Path):
+    spec = ComponentSpec.validate({"path": "pulp_rpm", "title": "RPM", "kind": "Content"})
+    basedir = Path(repo.working_dir).parent
+    loader = ComponentLoader([str(basedir)], [spec], cache_dir=cache_dir, check_git_dirty=False)
+    (component,) = loader.load_all().loaded
+    return component
+
+
+def test_warm_load_skips_discovery(repo: Repo, tmp_path: Path, discoveries: list[str]):
+    cold = load(repo, tmp_path / "cache")
+    warm = load(repo, tmp_path / "cache")
+
+    assert discoveries == ["pulp_rpm"]
+    assert warm == cold
+    assert warm.pkg_version == "1.0.0"
+    assert warm.git_revision == repo.head.commit.hexsha
+    assert sorted(warm.docs_files) == ["index.md", "user/guides/sync.md"]
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        pytest.param(lambda d: (d / "docs/user/guides/new.md").write_text("# New"), id="new-doc"),
+        pytest.param(lambda d: (d / "docs/user/guides/sync.md").unlink(), id="removed-doc"),
+        pytest.param(
+            lambda d: (d / "pyproject.toml").write_text('[project]\nversion = "2.0.0"'),
+            id="pyproject",
+        ),
+        pytest.param(lambda d: Repo(d).index.commit("empty"), id="new-commit"),
+        pytest.param(lambda d: Repo(d).git.checkout("-b", "feature"), id="new-branch"),
+    ],
+)
+def test_changes_invalidate_entry(repo: Repo, tmp_path: Path, discoveries: list[str], change):
+    load(repo, tmp_path / "cache")
+    change(Path(repo.working_dir))
+    component = load(repo, tmp_path / "cache")
+
+    assert discoveries == ["pulp_rpm", "pulp_rpm"]
+    assert component.git_revision == repo.head.commit.hexsha
+    assert component.git_branch == repo.active_branch.name
+
+
+def test_nested_template_config_invalidates_entry(repo: Repo, tmp_path: Path):
+    basedir = Path(repo.working_dir).parent
+    (basedir / "pulp_rpm/pulp_nested/docs").mkdir(parents=True)
+    spec = ComponentSpec.validate(
+        {"path": "pulp_rpm/pulp_nested", "title": "Nested", "kind": "Content"}
+    )
+    loader_args = ([str(basedir)], [spec])
+    ComponentLoader(*loader_args, cache_dir=tmp_path / "cache", check_git_dirty=False).load_all()
+    (basedir / "pulp_rpm/pulp_nested/template_config.yml").write_text("github_org: nested-org")
+    loader = ComponentLoader(*loader_args, cache_dir=tmp_path / "cache", check_git_dirty=False)
+    (component,) = loader.load_all().loaded
+    assert component.github_org == "nested-org"
+
+
+def test_corrupt_manifest_is_ignored(tmp_path: Path):
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text("{not json")
+    manifest = ComponentManifest(manifest_file)
+    assert manifest.get("key") is None
+    assert manifest.stats() == {"hits": 0, "misses": 1}
+
+
+def test_unwritable_cache_dir(repo: Repo, tmp_path: Path, caplog):
+    (tmp_path / "not-a-dir").write_text("")
+    component = load(repo, tmp_path / "not-a-dir/cache")
+    assert component.pkg_version == "1.0.0"
+    assert "Could not save the components manifest" in caplog.text
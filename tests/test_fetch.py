@@ -0,0 +1,140 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from git import Repo
+
+from pulp_docs.cli import clone_repositories, sparse_checkout_dirs
+from pulp_docs.plugin import ComponentSpec
+
+TREE = """
+=== remotes/pulpcore/CHANGES.md
+=== remotes/pulpcore/pyproject.toml
+=== remotes/pulpcore/docs/index.md
+=== remotes/pulpcore/pulpcore/app.py
+=== remotes/pulpcore/pulp_file/CHANGES.md
+=== remotes/pulpcore/pulp_file/docs/index.md
+=== remotes/pulpcore/pulp_file/pulp_file/app.py
+"""
+
+
+def make_spec(path: str, git_url: str) -> ComponentSpec:
+    return ComponentSpec.validate(
+        {"path": path, "title": path, "kind": "Content", "git_url": git_url}
+    )
+
+
+@pytest.fixture
+def remote(create_tree) -> str:
+    basedir, _ = create_tree(TREE)
+    repo = Repo.init(basedir / "remotes/pulpcore", initial_branch="main")
+    repo.git.add(".")
+    repo.index.commit("initial")
+    repo.git.config("uploadpack.allowFilter", "true")
+    return (basedir / "remotes/pulpcore").as_uri()
+
+
+def checked_out(repo_dir: Path) -> list[str]:
+    return sorted(
+        str(f.relative_to(repo_dir))
+        for f in repo_dir.rglob("*")
+        if f.is_file() and ".git" not in f.parts
+    )
+
+
+def test_sparse_checkout_dirs():
+    specs = [make_spec("pulpcore", "url"), make_spec("pulpcore/pulp_file", "url")]
+    assert sparse_checkout_dirs(specs) == {
+        "url": ["docs", "staging_docs", "pulp_file/docs", "pulp_file/staging_docs"]
+    }
+
+
+def test_sparse_clone(remote: str, tmp_path: Path):
+    specs = [make_spec("pulpcore", remote), make_spec("pulpcore/pulp_file", remote)]
+    sparse_dirs = sparse_checkout_dirs(specs)
+    asyncio.run(clone_repositories({remote}, tmp_path / "ws", sparse_dirs=sparse_dirs))
+
+    repo_dir = tmp_path / "ws/pulpcore"
+    assert checked_out(repo_dir) == [
+        "CHANGES.md",
+        "docs/index.md",
+        "pulp_file/CHANGES.md",
+        "pulp_file/docs/index.md",
+        "pyproject.toml",
+    ]
+    assert Repo(repo_dir).git.config("remote.origin.partialclonefilter") == "blob:none"
+
+
+def test_full_clone(remote: str, tmp_path: Path):
+    asyncio.run(clone_repositories({remote}, tmp_path / "ws"))
+    assert "pulp_file/pulp_file/app.py" in checked_out(tmp_path / "ws/pulpcore")
+
+
+def test_update(remote: str, tmp_path: Path):
+    dest_dir = tmp_path / "ws"
+    asyncio.run(clone_repositories({remote}, dest_dir))
+    assert asyncio.run(clone_repositories({remote}, dest_dir)) == {
+        "pulpcore": "skipped, already exists"
+    }
+    summary = asyncio.run(clone_repositories({remote}, dest_dir, update=True))
+    assert summary["pulpcore"].startswith("up to date at ")
+
+    remote_repo = Repo(remote.removeprefix("file://"))
+    old_revision = remote_repo.head.commit.hexsha
+    (Path(remote_repo.working_dir) / "docs/new.md").write_text("# New")
+    remote_repo.git.add(".")
+    new_revision = remote_repo.index.commit("add docs").hexsha
+    summary = asyncio.run(clone_repositories({remote}, dest_dir, update=True, jobs=1))
+    assert summary == {"pulpcore": f"updated {old_revision[:7]}..{new_revision[:7]}"}
+    assert (dest_dir / "pulpcore/docs/new.md").exists()
+
+
+def test_update_keeps_local_changes(remote: str, tmp_path: Path):
+    dest_dir = tmp_path / "ws"
+    asyncio.run(clone_repositories({remote}, dest_dir))
+    (dest_dir / "pulpcore/CHANGES.md").write_text("local change")
+    summary = asyncio.run(clone_repositories({remote}, dest_dir, update=True))
+    assert summary == {"pulpcore": "skipped, has local changes"}
+    assert (dest_dir / "pulpcore/CHANGES.md").read_text() == "local change"
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_mirror_cache(remote: str, tmp_path: Path, sparse: bool):
+    mirror_cache = tmp_path / "mirrors"
+    sparse_dirs = sparse_checkout_dirs([make_spec("pulpcore", remote)]) if sparse else None
+    for job in ["job1", "job2"]:
+        asyncio.run(
+            clone_repositories(
+                {remote}, tmp_path / job, sparse_dirs=sparse_dirs, mirror_cache=mirror_cache
+            )
+        )
+
+    (mirror,) = mirror_cache.glob("*.git")
+    for job in ["job1", "job2"]:
+        alternates = tmp_path / job / "pulpcore/.git/objects/info/alternates"
+        assert alternates.read_text().strip() == str(mirror / "objects")
+        files = checked_out(tmp_path / job / "pulpcore")
+        assert ("pulpcore/app.py" in files) is not sparse
+
+    remote_repo = Repo(remote.removeprefix("file://"))
+    remote_repo.git.checkout("-b", "feature")
+    new_revision = remote_repo.index.commit("feature").hexsha
+    remote_repo.git.checkout("main")
+    summary = asyncio.run(
+        clone_repositories({remote}, tmp_path / "job1", update=True, mirror_cache=mirror_cache)
+    )
+    assert summary["pulpcore"].startswith("up to date")
+    assert Repo(mirror).commit("feature").hexsha == new_revision
+
+
+def test_update_keeps_unpushed_commits(remote: str, tmp_path: Path):
+    dest_dir = tmp_path / "ws"
+    asyncio.run(clone_repositories({remote}, dest_dir))
+    local_repo = Repo(dest_dir / "pulpcore")
+    local_revision = local_repo.index.commit("not pushed").hexsha
+    remote_repo = Repo(remote.removeprefix("file://"))
+    remote_repo.index.commit("pushed by someone else")
+
+    summary = asyncio.run(clone_repositories({remote}, dest_dir, update=True))
+    assert summary == {"pulpcore": "skipped, has commits that are not on the remote branch"}
+    assert local_repo.head.commit.hexsha == local_revision
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import pytest
+from git import Repo
+
+from pulp_docs.gitrefs import GitHead, read_git_head
+
+
+@pytest.fixture
+def repo(tmp_path: Path) -> Repo:
+    repo = Repo.init(tmp_path / "repo", initial_branch="main")
+    for i in range(2):
+        (Path(repo.working_dir) / "file.txt").write_text(f"content {i}")
+        repo.index.add(["file.txt"])
+        repo.index.commit(f"commit {i}")
+    return repo
+
+
+def test_loose_ref(repo: Repo):
+    expected = GitHead(revision=repo.head.commit.hexsha, branch="main")
+    assert read_git_head(Path(repo.working_dir)) == expected
+
+
+def test_packed_ref(repo: Repo):
+    repo.git.pack_refs("--all")
+    assert not (Path(repo.git_dir) / "refs" / "heads" / "main").exists()
+    expected = GitHead(revision=repo.head.commit.hexsha, branch="main")
+    assert read_git_head(Path(repo.working_dir)) == expected
+
+
+def test_detached_head(repo: Repo):
+    first_commit = repo.head.commit.parents[0]
+    repo.git.checkout(first_commit.hexsha)
+    expected = GitHead(revision=first_commit.hexsha, branch=None)
+    assert read_git_head(Path(repo.working_dir)) == expected
+
+
+def test_worktree(repo: Repo, tmp_path: Path):
+    worktree_dir = tmp_path / "worktree"
+    repo.git.worktree("add", "-b", "feature/x", str(worktree_dir))
+    repo.git.pack_refs("--all")
+    expected = GitHead(revision=repo.head.commit.hexsha, branch="feature/x")
+    assert read_git_head(worktree_dir) == expected
+
+
+@pytest.mark.parametrize(
+    "setup",
+    [
+        pytest.param(lambda path: path.mkdir(), id="not-a-repo"),
+        pytest.param(lambda path: Repo.init(path), id="unborn-branch"),
+    ],
+)
+def test_unresolved(tmp_path: Path, setup):
+    repo_dir = tmp_path / "repo"
+    setup(repo_dir)
+    assert read_git_head(repo_dir) is None
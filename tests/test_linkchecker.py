@@ -3,7 +3,8 @@ from typing import NamedTuple
 
 import pytest
 
-from linkchecker.cli import HEADER_ERROR, extract_links, linkchecker
+from linkchecker import cli as linkchecker_cli
+from linkchecker.cli import HEADER_ERROR, LinkChecker, extract_links, linkchecker
 
 from .conftest import scenario_ids
 
@@ -91,6 +92,25 @@ cases = [
             docs/index.md:4  site:A/docs/reference/NOEXIT.md
         """,
     ),
+    Scenario(
+        name="links_in_code_ignored",
+        tree=f"""
+            === A/docs/index.md
+            Use `[invalid](site:A/docs/NOEXIT.md)` to link.
+
+            ```md
+            [invalid](site:A/docs/NOEXIT.md)
+            ```
+            [invalid](site:A/docs/guides/NOEXIT.md)
+            {COMMON_TREE}
+        """,
+        component_dir="A",
+        exit_code=1,
+        output=f"""
+            {HEADER_ERROR.format(n=1)}
+            docs/index.md:6  site:A/docs/guides/NOEXIT.md
+        """,
+    ),
 ]
 
 
@@ -104,6 +124,40 @@ def test_linkchecker_main(case: Scenario, create_tree, capsys):
     assert out.strip() == dedent(case.output).strip()
 
 
+@pytest.mark.parametrize("case", cases, ids=scenario_ids(cases))
+def test_linkchecker_parallel(case: Scenario, create_tree, capsys):
+    """Checking files in worker processes reports the same errors in the same order."""
+    basedir, files = create_tree(case.tree)
+    other_file = basedir / "A/docs/other.md"
+    other_file.write_text((basedir / "A/docs/index.md").read_text())
+    files.append(other_file)
+    exit_code = linkchecker(str(basedir / case.component_dir), files, jobs=2)
+    out, err = capsys.readouterr()
+    expected_output = dedent(case.output).strip()
+    if expected_output:
+        index_errors = expected_output.splitlines()[1:]
+        other_errors = [e.replace("index.md", "other.md") for e in index_errors]
+        header = HEADER_ERROR.format(n=len(index_errors) * 2)
+        expected_output = "\n".join([header] + index_errors + other_errors)
+    assert exit_code == case.exit_code
+    assert out.strip() == expected_output
+
+
+def test_link_targets_resolved_once(create_tree, monkeypatch):
+    basedir, _ = create_tree("=== A/docs/guides/foo.md\n# Section")
+    calls = []
+    real_file_exists = linkchecker_cli.file_exists
+    monkeypatch.setattr(
+        linkchecker_cli, "file_exists", lambda f: calls.append(f) or real_file_exists(f)
+    )
+    checker = LinkChecker(str(basedir / "A"))
+    assert checker.is_valid("site:A/docs/guides/foo")
+    assert checker.is_valid("site:A/docs/guides/foo#section")
+    assert not checker.is_valid("site:A/docs/guides/NOEXIST")
+    assert not checker.is_valid("site:A/docs/guides/NOEXIST")
+    assert len(calls) == 2
+
+
 class TestExtractLinks:
     not_found_cases = [
         LinkExtractionCase(
@@ -141,6 +195,36 @@ class TestExtractLinks:
             line="[ref]: http://example.com",
             expected_links=[],
         ),
+        LinkExtractionCase(
+            name="inline_code",
+            line="Use `[text](site:A/docs/foo)` to link",
+            expected_links=[],
+        ),
+        LinkExtractionCase(
+            name="inline_code_double_backticks",
+            line="Use ``[ref]: site:A/docs/foo`` to link",
+            expected_links=[],
+        ),
+        LinkExtractionCase(
+            name="fenced_code",
+            line="```md\n[text](site:A/docs/foo)\n```",
+            expected_links=[],
+        ),
+        LinkExtractionCase(
+            name="indented_tilde_fenced_code",
+            line="    ~~~\n    [ref]: site:A/docs/foo\n    ~~~",
+            expected_links=[],
+        ),
+        LinkExtractionCase(
+            name="unterminated_fenced_code",
+            line="```\n[text](site:A/docs/foo)",
+            expected_links=[],
+        ),
+        LinkExtractionCase(
+            name="link_text_across_lines",
+            line="[some\ntext](site:A/docs/foo)",
+            expected_links=[],
+        ),
     ]
 
     success_cases = [
@@ -219,6 +303,16 @@ class TestExtractLinks:
             line="[link](site:A/docs/foo-bar_baz)",
             expected_links=["site:A/docs/foo-bar_baz"],
         ),
+        LinkExtractionCase(
+            name="link_next_to_inline_code",
+            line="`code` and [link](site:A/docs/foo)",
+            expected_links=["site:A/docs/foo"],
+        ),
+        LinkExtractionCase(
+            name="link_after_fenced_code",
+            line="```\n[text](site:A/docs/bar)\n````\n[link](site:A/docs/foo)",
+            expected_links=["site:A/docs/foo"],
+        ),
     ]
 
     @pytest.mark.parametrize("case", not_found_cases, ids=scenario_ids(not_found_cases))
@@ -0,0 +1,199 @@
+import sys
+from functools import partial
+from typing import NamedTuple
+
+import pytest
+from pymdownx.slugs import slugify as pymdownx_slugify
+
+from linkchecker.anchors import AnchorIndex, SlugRules, extract_anchors
+from linkchecker.cli import LinkChecker, linkchecker, load_slug_rules, main
+
+from .conftest import scenario_ids
+
+
+class AnchorCase(NamedTuple):
+    name: str
+    text: str
+    expected_anchors: set[str]
+
+
+TABBED_RULES = SlugRules(tab_slugify=pymdownx_slugify(case="lower"))
+
+anchor_cases = [
+    AnchorCase(name="atx_heading", text="# Some Title", expected_anchors={"some-title"}),
+    AnchorCase(name="closed_atx_heading", text="## Some Title ##", expected_anchors={"some-title"}),
+    AnchorCase(name="setext_heading", text="Some Title\n===", expected_anchors={"some-title"}),
+    AnchorCase(
+        name="punctuation_and_accents",
+        text="## What's new in Pulp 3.0? Ça va!",
+        expected_anchors={"whats-new-in-pulp-30-ca-va"},
+    ),
+    AnchorCase(
+        name="inline_markup",
+        text="## The `pulp_file` [plugin](site:pulp_file/) is **great**",
+        expected_anchors={"the-pulp_file-plugin-is-great"},
+    ),
+    AnchorCase(
+        name="duplicated_headings",
+        text="## Setup\n## Setup\n## Setup",
+        expected_anchors={"setup", "setup_1", "setup_2"},
+    ),
+    AnchorCase(
+        name="custom_heading_id",
+        text="## Some Title { #custom-id }",
+        expected_anchors={"custom-id"},
+    ),
+    AnchorCase(
+        name="explicit_anchors",
+        text='Text { #attr-id }\n\n<a id="html-id"></a> <a name="html-name"></a>',
+        expected_anchors={"attr-id", "html-id", "html-name"},
+    ),
+    AnchorCase(
+        name="fenced_code_ignored",
+        text="```bash\n# not a heading\n```\n# Heading",
+        expected_anchors={"heading"},
+    ),
+    AnchorCase(
+        name="front_matter_ignored",
+        text="---\ntemplate: page.html\n---\n# Heading",
+        expected_anchors={"heading"},
+    ),
+    AnchorCase(
+        name="list_and_rule_not_headings",
+        text="- item\n---\n\nparagraph\n\n---",
+        expected_anchors=set(),
+    ),
+    AnchorCase(
+        name="tabs_without_slugify",
+        text='=== "Some Tab"\n    content',
+        expected_anchors=set(),
+    ),
+]
+
+
+@pytest.mark.parametrize("case", anchor_cases, ids=scenario_ids(anchor_cases))
+def test_extract_anchors(case: AnchorCase):
+    assert extract_anchors(case.text) == case.expected_anchors
+
+
+def test_extract_tab_anchors():
+    text = '# Install\n=== "Some Tab"\n    content\n=== "Install"\n    content'
+    assert extract_anchors(text, TABBED_RULES) == {"install", "some-tab", "install_1"}
+
+
+def test_slug_rules_from_mdx_configs():
+    tab_slugify = pymdownx_slugify(case="lower")
+    mdx_configs = {
+        "toc": {"permalink": True},
+        "pymdownx.tabbed": {"alternate_style": True, "slugify": tab_slugify},
+    }
+    assert SlugRules.from_mdx_configs(mdx_configs) == SlugRules(tab_slugify=tab_slugify)
+    custom_toc = {"toc": {"slugify": partial(pymdownx_slugify(case="lower")), "separator": "_"}}
+    rules = SlugRules.from_mdx_configs(custom_toc)
+    assert rules.slugify("Some Title", rules.separator) == "some_title"
+
+
+def test_fragment_links(create_tree, capsys):
+    basedir, files = create_tree(
+        """
+        === A/docs/index.md
+        [valid](site:A/docs/guides/foo#some-section)
+        [valid](site:A/docs/guides/foo.md#some-section_1)
+        [valid](site:A/docs/guides/#overview)
+        [valid](site:A/docs/guides/foo#)
+        [invalid](site:A/docs/guides/foo#renamed-section)
+        [unchecked](site:A/docs/reference/#anything)
+        === A/docs/guides/foo.md
+        ## Some section
+        ## Some section
+        === A/docs/guides/index.md
+        # Overview
+        === A/docs/reference/bar.md
+        # Bar
+        """
+    )
+    exit_code = linkchecker(str(basedir / "A"), files)
+    out, _ = capsys.readouterr()
+    assert exit_code == 1
+    assert out.splitlines()[1:] == ["docs/index.md:5  site:A/docs/guides/foo#renamed-section"]
+
+
+def test_anchors_read_once_per_target(create_tree, monkeypatch):
+    basedir, _ = create_tree(
+        """
+        === A/docs/guides/foo.md
+        ## Some section
+        === A/docs/guides/bar.md
+        ## Other section
+        """
+    )
+    reads = []
+    real_read_anchors = AnchorIndex._read_anchors
+    monkeypatch.setattr(
+        AnchorIndex,
+        "_read_anchors",
+        lambda self, f: reads.append(f) or real_read_anchors(self, f),
+    )
+    checker = LinkChecker(str(basedir / "A"))
+    for _ in range(3):
+        assert checker.is_valid("site:A/docs/guides/foo#some-section")
+        assert not checker.is_valid("site:A/docs/guides/foo.md#other-section")
+    assert reads == [str(basedir / "A/docs/guides/foo.md")]
+
+
+def test_slug_rules_loaded_on_first_fragment(create_tree):
+    basedir, _ = create_tree(
+        """
+        === A/docs/guides/foo.md
+        ## Some section
+        """
+    )
+    loads = []
+
+    def load_rules() -> SlugRules:
+        loads.append(1)
+        return SlugRules(separator="_")
+
+    checker = LinkChecker(str(basedir / "A"), slug_rules=load_rules)
+    assert checker.is_valid("site:A/docs/guides/foo")
+    assert loads == []
+    assert checker.is_valid("site:A/docs/guides/foo#some_section")
+    assert checker.is_valid("site:A/docs/guides/foo#some_section")
+    assert loads == [1]
+
+
+def test_main_uses_configured_slug_rules(create_tree, monkeypatch, capsys):
+    """The tab slugify of the mkdocs.yml applies without --site too (e.g, in pre-commit)."""
+    basedir, files = create_tree(
+        """
+        === A/docs/index.md
+        [valid](site:A/docs/guides/foo#my-tab)
+        === A/docs/guides/foo.md
+        """
+    )
+    (basedir / "A/docs/guides/foo.md").write_text('=== "My Tab"\n\n    Content\n')
+    argv = ["pulp-linkchecker", "--basedir", str(basedir / "A"), *map(str, files)]
+    monkeypatch.setattr(sys, "argv", argv)
+    with pytest.raises(SystemExit) as exc_info:
+        main()
+    out, _ = capsys.readouterr()
+    assert exc_info.value.code == 0, out
+
+
+def test_load_slug_rules(tmp_path):
+    """Only the markdown_extensions of the config are read, in any of their forms."""
+    config_file = tmp_path / "mkdocs.yml"
+    config_file.write_text(
+        "site_name: Test\n"
+        "plugins:\n  - not-installed\n"
+        "markdown_extensions:\n  - attr_list\n  - toc:\n      separator: _\n"
+    )
+    rules = load_slug_rules(str(config_file))
+    assert rules.separator == "_"
+    assert rules.tab_slugify is None
+
+    config_file.write_text("markdown_extensions:\n  toc:\n    separator: _\n  attr_list:\n")
+    assert load_slug_rules(str(config_file)).separator == "_"
+
+    default_rules = load_slug_rules()
+    assert default_rules.tab_slugify("My Tab", "-") == "my-tab"
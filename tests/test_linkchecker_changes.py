@@ -0,0 +1,132 @@
+import sys
+from pathlib import Path
+
+import pytest
+from git import Repo
+
+from linkchecker.changes import DocsChanges, LinkIndex, affected_targets, changes_since
+from linkchecker.cli import main, select_changed_files
+
+TREE = """
+=== A/docs/index.md
+[guide](site:A/docs/guides/foo)
+=== A/docs/guides/foo.md
+[reference](site:A/docs/reference/bar#bar)
+=== A/docs/guides/other.md
+[reference](site:A/docs/reference/)
+=== A/docs/reference/bar.md
+# Bar
+=== A/docs/reference/unrelated.md
+Content with no links
+"""
+
+
+@pytest.fixture
+def repo(create_tree, tmp_path: Path) -> Repo:
+    create_tree(TREE)
+    repo = Repo.init(tmp_path / "A", initial_branch="main")
+    repo.git.add(".")
+    repo.index.commit("initial")
+    repo.git.checkout("-b", "feature")
+    return repo
+
+
+def run_main(monkeypatch, capsys, basedir: Path, *args: str) -> tuple[int, list[str]]:
+    files = sorted(str(f) for f in basedir.rglob("*.md"))
+    argv = ["pulp-linkchecker", "--verbose", "--basedir", str(basedir), *args, *files]
+    monkeypatch.setattr(sys, "argv", argv)
+    with pytest.raises(SystemExit) as exc_info:
+        main()
+    out, _ = capsys.readouterr()
+    checked = [line.removeprefix("== Checking: ") for line in out.splitlines() if "==" in line]
+    return exc_info.value.code, [str(Path(f).relative_to(basedir)) for f in checked]
+
+
+def test_changes_since(repo: Repo):
+    basedir = Path(repo.working_dir)
+    repo.git.mv("docs/reference/bar.md", "docs/reference/baz.md")
+    repo.index.commit("rename")
+    (basedir / "docs/guides/foo.md").write_text("modified, not committed")
+    (basedir / "docs/reference/unrelated.md").unlink()
+    (basedir / "docs/new.md").write_text("untracked")
+    assert changes_since(str(basedir), "main") == DocsChanges(
+        changed={"docs/reference/baz.md", "docs/guides/foo.md", "docs/new.md"},
+        removed={"docs/reference/bar.md", "docs/reference/unrelated.md"},
+    )
+
+
+def test_changes_since_unknown_ref(repo: Repo):
+    with pytest.raises(RuntimeError, match="git merge-base failed"):
+        changes_since(repo.working_dir, "no-such-ref")
+
+
+def test_affected_targets():
+    assert affected_targets("A", ["docs/reference/bar.md"]) == {
+        "A/docs/reference/bar",
+        "A/docs/reference",
+        "A/docs",
+        "A",
+    }
+
+
+def test_select_changed_files(repo: Repo):
+    basedir = Path(repo.working_dir)
+    link_index = LinkIndex()
+    link_index.update("docs/index.md", ["site:A/docs/guides/foo"])
+    link_index.update("docs/guides/foo.md", ["site:A/docs/reference/bar.md#bar"])
+    link_index.update("docs/guides/other.md", ["site:A/docs/reference/"])
+    (basedir / "docs/reference/bar.md").write_text("# Renamed heading")
+    files = [str(f) for f in sorted(basedir.rglob("*.md"))]
+    selected = select_changed_files(str(basedir), files, "main", link_index)
+    assert sorted(Path(f).relative_to(basedir).as_posix() for f in selected) == [
+        "docs/guides/foo.md",
+        "docs/guides/other.md",
+        "docs/reference/bar.md",
+    ]
+
+
+def test_changed_since_main(repo: Repo, tmp_path: Path, monkeypatch, capsys):
+    basedir = Path(repo.working_dir)
+    cache_args = ["--cache-dir", str(tmp_path / "cache"), "--changed-since", "main"]
+
+    # the first run checks everything to build the link index
+    exit_code, checked = run_main(monkeypatch, capsys, basedir, *cache_args)
+    assert exit_code == 0
+    assert len(checked) == 5
+
+    exit_code, checked = run_main(monkeypatch, capsys, basedir, *cache_args)
+    assert exit_code == 0
+    assert checked == []
+
+    repo.git.mv("docs/guides/foo.md", "docs/guides/renamed.md")
+    repo.index.commit("rename foo")
+    exit_code, checked = run_main(monkeypatch, capsys, basedir, *cache_args)
+    assert exit_code == 1
+    assert checked == ["docs/guides/renamed.md", "docs/index.md"]
+
+
+def test_changed_since_unknown_ref(repo: Repo, tmp_path: Path, monkeypatch, capsys):
+    basedir = Path(repo.working_dir)
+    cache_args = ["--cache-dir", str(tmp_path / "cache"), "--changed-since", "no-such-ref"]
+    exit_code, checked = run_main(monkeypatch, capsys, basedir, *cache_args)
+    assert exit_code == 2
+    assert checked == []
+
+
+def test_fail_fast_does_not_save_partial_index(repo: Repo, tmp_path: Path, monkeypatch, capsys):
+    basedir = Path(repo.working_dir)
+    cache_args = ["--cache-dir", str(tmp_path / "cache"), "--changed-since", "HEAD"]
+    (basedir / "docs/guides/foo.md").write_text("[broken](site:A/docs/missing)")
+    (basedir / "docs/guides/other.md").write_text("[reference](site:A/docs/reference/bar)")
+    repo.git.add(".")
+    repo.index.commit("broken link")
+
+    exit_code, checked = run_main(monkeypatch, capsys, basedir, *cache_args, "--fail-fast")
+    assert exit_code == 1
+    assert checked == ["docs/guides/foo.md"]
+
+    # other.md wasn't indexed by the stopped run, so it's checked when its target is removed
+    repo.git.rm("docs/reference/bar.md")
+    exit_code, checked = run_main(monkeypatch, capsys, basedir, *cache_args)
+    assert exit_code == 1
+    assert "docs/guides/other.md" in checked
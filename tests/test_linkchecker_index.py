@@ -0,0 +1,157 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+from mkdocs.config import load_config
+
+from linkchecker import index as linkchecker_index
+from linkchecker.cli import LinkChecker, linkchecker, main
+from linkchecker.index import SiteIndex, find_component_dirs
+
+SITE_TREE = """
+=== A/docs/index.md
+[valid](site:A/docs/guides/foo)
+[valid](site:B/docs/reference/bar.md#some-section)
+[valid](site:B/changes/)
+[invalid](site:B/docs/guides/NOEXIT)
+[invalid](site:UNKNOWN/docs/guides/foo)
+[missing component](site:C/docs/guides/foo)
+[restapi](site:B/restapi/#some-operation)
+=== A/docs/guides/foo.md
+Content from file foo, repository A
+=== B/docs/reference/bar.md
+## Some section
+Content from file bar, repository B
+=== B/CHANGES.md
+Changelog of B
+"""
+
+
+@pytest.fixture
+def component_dirs(tmp_path: Path) -> dict[str, str | None]:
+    return {"A": str(tmp_path / "A"), "B": str(tmp_path / "B"), "C": None}
+
+
+def test_cross_component_links(create_tree, component_dirs, capsys):
+    basedir, files = create_tree(SITE_TREE)
+    site_index = SiteIndex.build(component_dirs)
+    exit_code = linkchecker(str(basedir / "A"), files, site_index=site_index)
+    out, _ = capsys.readouterr()
+    assert exit_code == 1
+    assert out.splitlines()[1:] == [
+        "docs/index.md:4  site:B/docs/guides/NOEXIT",
+        "docs/index.md:5  site:UNKNOWN/docs/guides/foo",
+    ]
+
+
+@pytest.mark.parametrize(
+    "link,valid",
+    [
+        ("site:B/docs/reference/bar", True),
+        ("site:B/docs/reference/bar.md", True),
+        ("site:B/docs/reference/bar/", True),
+        ("site:B/docs/reference/", True),
+        ("site:B/docs/guides/../reference/bar", True),
+        ("site:B/docs/reference/bar.txt", False),
+        ("site:B/changes", True),
+        ("site:A/changes", False),
+    ],
+)
+def test_link_normalization(create_tree, component_dirs, link: str, valid: bool):
+    basedir, _ = create_tree(SITE_TREE)
+    checker = LinkChecker(str(basedir / "A"), SiteIndex.build(component_dirs))
+    assert checker.is_valid(link) is valid
+
+
+def test_index_persisted(create_tree, component_dirs, tmp_path, monkeypatch):
+    create_tree(SITE_TREE)
+    index_file = str(tmp_path / "cache" / "site-index.json")
+    SiteIndex.build(component_dirs, index_file)
+
+    indexed = []
+    real_index_component = linkchecker_index.index_component
+    monkeypatch.setattr(
+        linkchecker_index,
+        "index_component",
+        lambda d: indexed.append(os.path.basename(d)) or real_index_component(d),
+    )
+    assert "site:B/docs/reference/bar" in SiteIndex.build(component_dirs, index_file)
+    assert indexed == []
+
+    # only the component with a new file is indexed again
+    (tmp_path / "B" / "docs" / "reference" / "new.md").write_text("New page")
+    site_index = SiteIndex.build(component_dirs, index_file)
+    assert indexed == ["B"]
+    assert "site:B/docs/reference/new" in site_index
+
+    # a new docs directory is noticed from the component directory mtime
+    (tmp_path / "B" / "staging_docs").mkdir()
+    (tmp_path / "B" / "staging_docs" / "index.md").write_text("Staging")
+    site_index = SiteIndex.build(component_dirs, index_file)
+    assert indexed == ["B", "B"]
+    assert "site:B/staging_docs/index.md" in site_index
+
+
+def test_site_root_links(create_tree, tmp_path, capsys):
+    basedir, files = create_tree(
+        """
+        === A/docs/index.md
+        [valid](site:help/)
+        [valid](site:help/more#more-help)
+        [invalid](site:help/NOEXIT)
+        [invalid](site:help/more#NOEXIT)
+        === site/help/index.md
+        # Help
+        === site/help/more.md
+        # More help
+        """
+    )
+    component_dirs = {"A": str(tmp_path / "A")}
+    site_index = SiteIndex.build(component_dirs, site_docs_dir=str(tmp_path / "site"))
+    exit_code = linkchecker(str(basedir / "A"), files[:1], site_index=site_index)
+    out, _ = capsys.readouterr()
+    assert exit_code == 1
+    assert out.splitlines()[1:] == [
+        "docs/index.md:3  site:help/NOEXIT",
+        "docs/index.md:4  site:help/more#NOEXIT",
+    ]
+
+
+def test_site_root_links_of_pulp_docs(create_tree, tmp_path, monkeypatch, capsys):
+    """The pages of pulpproject.org are linked from components, e.g, site:help/."""
+    basedir, files = create_tree(
+        """
+        === A/docs/index.md
+        [help](site:help/)
+        [blog](site:blog/)
+        """
+    )
+    cache_dir = tmp_path / "cache"
+    argv = ["pulp-linkchecker", "--site", "--basedir", str(basedir / "A"), "--cache-dir"]
+    monkeypatch.setattr(sys, "argv", [*argv, str(cache_dir), *map(str, files)])
+    with pytest.raises(SystemExit) as exc_info:
+        main()
+    out, _ = capsys.readouterr()
+    assert exc_info.value.code == 0, out
+
+
+def test_find_component_dirs(tmp_path):
+    (tmp_path / "pulpcore" / "pulp_file").mkdir(parents=True)
+    (tmp_path / "docs").mkdir()
+    components = [
+        {"title": "Pulpcore", "path": "pulpcore", "kind": "Core"},
+        {"title": "File", "path": "pulpcore/pulp_file", "kind": "Content"},
+        {"title": "Missing", "path": "pulp_missing", "kind": "Content"},
+    ]
+    config_file = tmp_path / "mkdocs.yml"
+    config_file.write_text(
+        yaml.safe_dump({"site_name": "test", "plugins": [{"PulpDocs": {"components": components}}]})
+    )
+    config = load_config(str(config_file))
+    assert find_component_dirs(config, [str(tmp_path)]) == {
+        "pulpcore": str(tmp_path / "pulpcore"),
+        "pulp_file": str(tmp_path / "pulpcore" / "pulp_file"),
+        "pulp_missing": None,
+    }
@@ -0,0 +1,148 @@
+import json
+import os
+
+import pytest
+
+from linkchecker import cli as linkchecker_cli
+from linkchecker.cli import linkchecker
+from linkchecker.report import SARIF_RULE_ID, Reporter
+
+TREE = """
+=== A/docs/index.md
+[valid](site:A/docs/guides/foo)
+[invalid](site:A/docs/guides/NOEXIT)
+[invalid](site:A/docs/guides/foo#NOEXIT)
+=== A/docs/guides/foo.md
+# Foo
+[invalid](site:A/docs/reference/NOEXIT)
+=== A/docs/reference/bar.md
+# Bar
+"""
+
+
+@pytest.fixture
+def tree(create_tree, monkeypatch):
+    basedir, files = create_tree(TREE)
+    # reported paths other than text are relative to the working directory
+    monkeypatch.chdir(basedir)
+    return basedir, files
+
+
+def test_json(tree, capsys):
+    basedir, files = tree
+    assert linkchecker(str(basedir / "A"), files, output_format="json") == 1
+    out, _ = capsys.readouterr()
+    assert [json.loads(line) for line in out.splitlines()] == [
+        {
+            "file": "docs/index.md",
+            "line": 2,
+            "link": "site:A/docs/guides/NOEXIT",
+            "text": "[invalid](site:A/docs/guides/NOEXIT)",
+        },
+        {
+            "file": "docs/index.md",
+            "line": 3,
+            "link": "site:A/docs/guides/foo#NOEXIT",
+            "text": "[invalid](site:A/docs/guides/foo#NOEXIT)",
+        },
+        {
+            "file": "docs/guides/foo.md",
+            "line": 2,
+            "link": "site:A/docs/reference/NOEXIT",
+            "text": "[invalid](site:A/docs/reference/NOEXIT)",
+        },
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_sarif(tree, capsys, jobs: int):
+    basedir, files = tree
+    assert linkchecker(str(basedir / "A"), files, jobs=jobs, output_format="sarif") == 1
+    out, _ = capsys.readouterr()
+    sarif = json.loads(out)
+    assert sarif["version"] == "2.1.0"
+    (run,) = sarif["runs"]
+    assert run["tool"]["driver"]["name"] == "pulp-linkchecker"
+    locations = [
+        (
+            result["locations"][0]["physicalLocation"]["artifactLocation"]["uri"],
+            result["locations"][0]["physicalLocation"]["region"]["startLine"],
+        )
+        for result in run["results"]
+    ]
+    assert locations == [
+        ("A/docs/index.md", 2),
+        ("A/docs/index.md", 3),
+        ("A/docs/guides/foo.md", 2),
+    ]
+    assert {result["ruleId"] for result in run["results"]} == {SARIF_RULE_ID}
+
+
+def test_sarif_without_errors(create_tree, capsys):
+    basedir, files = create_tree("=== A/docs/index.md\nNo links")
+    assert linkchecker(str(basedir / "A"), files, output_format="sarif") == 0
+    out, _ = capsys.readouterr()
+    assert json.loads(out)["runs"][0]["results"] == []
+
+
+@pytest.mark.parametrize("output_format", ["json", "sarif", "github"])
+def test_verbose_output_is_not_mixed_in(tree, capsys, output_format: str):
+    basedir, files = tree
+    linkchecker(str(basedir / "A"), files, verbose=True, output_format=output_format)
+    out, err = capsys.readouterr()
+    assert "== Checking" not in out
+    assert err.count("== Checking") == 3
+    if output_format == "sarif":
+        assert len(json.loads(out)["runs"][0]["results"]) == 3
+
+
+def test_github(tree, capsys):
+    basedir, files = tree
+    assert linkchecker(str(basedir / "A"), files, output_format="github") == 1
+    out, _ = capsys.readouterr()
+    assert out.splitlines() == [
+        "::error file=A/docs/index.md,line=2,title=Broken link::site:A/docs/guides/NOEXIT",
+        "::error file=A/docs/index.md,line=3,title=Broken link::site:A/docs/guides/foo#NOEXIT",
+        "::error file=A/docs/guides/foo.md,line=2,title=Broken link::site:A/docs/reference/NOEXIT",
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+@pytest.mark.parametrize("output_format", ["text", "json"])
+def test_fail_fast(tree, capsys, output_format: str, jobs: int):
+    basedir, files = tree
+    exit_code = linkchecker(
+        str(basedir / "A"), files, jobs=jobs, output_format=output_format, fail_fast=True
+    )
+    out, _ = capsys.readouterr()
+    assert exit_code == 1
+    assert "site:A/docs/guides/NOEXIT" in out
+    assert "site:A/docs/guides/foo#NOEXIT" not in out
+    assert "site:A/docs/reference/NOEXIT" not in out
+
+
+def test_errors_reported_while_checking(tree, monkeypatch):
+    basedir, files = tree
+    events = []
+
+    class RecordingReporter(Reporter):
+        def report(self, error):
+            events.append(("report", os.path.basename(error.src_filename)))
+
+    real_check_file = linkchecker_cli.check_file
+
+    def check_file(src_filename, checker):
+        events.append(("check", os.path.basename(src_filename)))
+        return real_check_file(src_filename, checker)
+
+    monkeypatch.setitem(linkchecker_cli.REPORTERS, "recording", RecordingReporter)
+    monkeypatch.setattr(linkchecker_cli, "check_file", check_file)
+    linkchecker(str(basedir / "A"), files, output_format="recording")
+    assert events == [
+        ("check", "index.md"),
+        ("report", "index.md"),
+        ("report", "index.md"),
+        ("check", "foo.md"),
+        ("report", "foo.md"),
+        ("check", "bar.md"),
+    ]
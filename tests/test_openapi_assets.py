@@ -0,0 +1,68 @@
+import gzip
+import json
+
+import pytest
+
+from pulp_docs import openapi
+from pulp_docs.openapi import api_asset_files, write_api_assets
+
+SPEC = {"openapi": "3.0.3", "info": {"title": "Pulp 3 API"}, "paths": {"/ü/": {"get": {}}}}
+
+
+def test_minified_and_compressed(tmp_path, monkeypatch):
+    monkeypatch.setattr(openapi, "brotli", None)
+    spec_file = tmp_path / "file-api.json"
+    spec_file.write_text(json.dumps(SPEC, indent=2))
+
+    assets = write_api_assets(spec_file)
+    assert list(assets) == ["api.json", "api.json.gz"]
+    minified = assets["api.json"].read_bytes()
+    assert json.loads(minified) == SPEC
+    assert len(minified) < spec_file.stat().st_size
+    assert b"\n" not in minified
+    assert gzip.decompress(assets["api.json.gz"].read_bytes()) == minified
+    # gzip output doesn't depend on when it was built
+    assert write_api_assets(spec_file)["api.json.gz"].read_bytes() == (
+        assets["api.json.gz"].read_bytes()
+    )
+
+
+def test_brotli(tmp_path):
+    brotli = pytest.importorskip("brotli")
+    spec_file = tmp_path / "file-api.json"
+    spec_file.write_text(json.dumps(SPEC, indent=2))
+    assets = write_api_assets(spec_file)
+    assert brotli.decompress(assets["api.json.br"].read_bytes()) == assets["api.json"].read_bytes()
+
+
+def test_invalid_json_served_as_is(tmp_path):
+    spec_file = tmp_path / "file-api.json"
+    spec_file.write_text("dry-run specfile for: file")
+    assert write_api_assets(spec_file) == {"api.json": spec_file}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 1 << 20])
+def test_minified_in_chunks(chunk_size):
+    spec = {**SPEC, "description": 'a "quoted" { text }\n', "numbers": [1, -2.5e3, True, None]}
+    document = json.dumps(spec, indent=2, ensure_ascii=False).encode()
+    minified = b"".join(openapi._minified_chunks(document, chunk_size=chunk_size))
+    assert minified == json.dumps(spec, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+@pytest.mark.parametrize(
+    "content",
+    ["", "{}}", '{"a": 1', '{"a": 1} trailing', '"text"', 'x{"a": 1}', '{"a": nope ()}'],
+)
+def test_malformed_json_served_as_is(tmp_path, content):
+    spec_file = tmp_path / "file-api.json"
+    spec_file.write_text(content)
+    assert write_api_assets(spec_file) == {"api.json": spec_file}
+    assert not (tmp_path / "file-api-assets").exists()
+
+
+def test_asset_files(tmp_path):
+    spec_file = tmp_path / "file-api.json"
+    spec_file.write_text(json.dumps(SPEC))
+    assert api_asset_files(spec_file) == {"api.json": spec_file}
+    asset_files = write_api_assets(spec_file)
+    assert api_asset_files(spec_file) == asset_files
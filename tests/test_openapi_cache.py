@@ -0,0 +1,147 @@
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from pulp_docs.openapi import (
+    OpenAPIGenerator,
+    OpenApiPlugin,
+    OpenAPISpecCache,
+    api_asset_files,
+    write_api_assets,
+)
+
+
+def make_plugin(label: str, revision: str = "abc123", dirty: bool | None = False) -> OpenApiPlugin:
+    return OpenApiPlugin(
+        repository_path=Path(f"/repos/pulp_{label}"),
+        plugin_label=label,
+        git_revision=revision,
+        git_dirty=dirty,
+    )
+
+
+@pytest.fixture
+def cache(tmp_path: Path) -> OpenAPISpecCache:
+    return OpenAPISpecCache(tmp_path / "cache")
+
+
+@pytest.fixture
+def spec_file(tmp_path: Path) -> Path:
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text('{"info": {}}')
+    return spec_file
+
+
+class TestOpenAPISpecCache:
+    def test_put_and_get(self, cache: OpenAPISpecCache, spec_file: Path):
+        plugin = make_plugin("file")
+        assert cache.get(plugin) is None
+        cache.put(plugin, spec_file)
+        cached_file = cache.get(plugin)
+        assert cached_file is not None
+        assert cached_file.read_text() == spec_file.read_text()
+        assert cache.stats() == {"hits": 1, "misses": 1}
+
+    @pytest.mark.parametrize(
+        "plugin",
+        [
+            pytest.param(make_plugin("file", dirty=True), id="dirty"),
+            pytest.param(make_plugin("file", dirty=None), id="dirty-not-checked"),
+            pytest.param(make_plugin("file", revision="unknown"), id="unknown-revision"),
+            pytest.param(make_plugin("file", revision=""), id="no-revision"),
+        ],
+    )
+    def test_uncacheable(self, cache: OpenAPISpecCache, spec_file: Path, plugin: OpenApiPlugin):
+        cache.put(plugin, spec_file)
+        assert cache.get(plugin) is None
+
+    def test_key_depends_on_revision_and_label(self, cache: OpenAPISpecCache, spec_file: Path):
+        cache.put(make_plugin("file", revision="abc123"), spec_file)
+        assert cache.get(make_plugin("file", revision="def456")) is None
+        assert cache.get(make_plugin("rpm", revision="abc123")) is None
+
+    def test_shared_env_specs(self, cache: OpenAPISpecCache, spec_file: Path):
+        """Shared environment specs are only used by shared environment builds."""
+        shared, isolated = make_plugin("file"), make_plugin("rpm")
+        cache.put(shared, spec_file, shared_env=True)
+        cache.put(isolated, spec_file)
+        assert cache.get(shared) is None
+        assert cache.get(shared, shared_env=True) is not None
+        assert cache.get(isolated, shared_env=True) is not None
+
+    def test_evict_max_entries(self, tmp_path: Path, spec_file: Path):
+        cache = OpenAPISpecCache(tmp_path / "cache", max_entries=2)
+        plugins = [make_plugin(label) for label in ("file", "rpm", "deb")]
+        for i, plugin in enumerate(plugins):
+            cache.put(plugin, spec_file)
+            entry = cache.cache_dir / f"{cache.key(plugin)}.json"
+            os.utime(entry, (time.time() - 100 + i, time.time() - 100 + i))
+        cache.evict()
+        assert cache.get(plugins[0]) is None
+        assert cache.get(plugins[1]) is not None
+        assert cache.get(plugins[2]) is not None
+
+    def test_evict_max_age(self, tmp_path: Path, spec_file: Path):
+        cache = OpenAPISpecCache(tmp_path / "cache", max_age=60)
+        old, new = make_plugin("file"), make_plugin("rpm")
+        cache.put(old, spec_file)
+        cache.put(new, spec_file)
+        old_entry = cache.cache_dir / f"{cache.key(old)}.json"
+        os.utime(old_entry, (time.time() - 120, time.time() - 120))
+        cache.evict()
+        assert cache.get(old) is None
+        assert cache.get(new) is not None
+
+
+def test_generator_uses_cache(cache: OpenAPISpecCache, spec_file: Path):
+    """A cached spec is reused without running uv."""
+    plugin = make_plugin("file")
+    cache.put(plugin, spec_file)
+    generator = OpenAPIGenerator([plugin], cache=cache)
+    label_to_specfile = generator.generate()
+    assert label_to_specfile["file"].read_text() == spec_file.read_text()
+    assert cache.stats() == {"hits": 1, "misses": 0}
+
+
+def test_assets_are_cached(cache: OpenAPISpecCache, spec_file: Path, tmp_path: Path):
+    """The assets of a spec are cached and restored along with it, and evicted with it."""
+    plugin = make_plugin("file")
+    cache.put(plugin, spec_file)
+    write_api_assets(spec_file)
+    cache.put(plugin, spec_file)
+    output_file = tmp_path / "output/file-api.json"
+    output_file.parent.mkdir()
+    generator = OpenAPIGenerator([plugin], cache=cache)
+    assert generator._restore_cached("file", output_file)
+    assert api_asset_files(output_file)["api.json"].read_text() == '{"info":{}}'
+
+    cache.max_age = -1
+    cache.evict()
+    assert not list(cache.cache_dir.iterdir())
+
+
+def test_unwritable_cache_dir(tmp_path: Path, spec_file: Path, caplog):
+    """A cache that can't be written doesn't fail the build."""
+    (tmp_path / "not-a-dir").write_text("")
+    cache = OpenAPISpecCache(tmp_path / "not-a-dir/cache")
+    plugin = make_plugin("file")
+    cache.put(plugin, spec_file)
+    cache.evict()
+    assert cache.get(plugin) is None
+    assert "Could not cache the openapi spec of file" in caplog.text
+
+
+def test_generator_caches_shared_env_specs(cache: OpenAPISpecCache, monkeypatch):
+    plugins = [make_plugin("file"), make_plugin("rpm")]
+    generator = OpenAPIGenerator(plugins, cache=cache, shared_env=True)
+
+    def fake_generate_shared(labels, label_to_specfile):
+        for label in labels:
+            label_to_specfile[label].write_text("{}")
+
+    monkeypatch.setattr(generator, "_generate_shared", fake_generate_shared)
+    generator.generate()
+    assert cache.get(plugins[0]) is None
+    assert cache.get(plugins[0], shared_env=True) is not None
@@ -1,7 +1,11 @@
+import subprocess
+import threading
+import time
+
 import pytest
 
 from pulp_docs.cli import fetch_repositories
-from pulp_docs.openapi import OpenAPIGenerator, OpenApiPlugin
+from pulp_docs.openapi import OpenAPIGenerator, OpenApiPlugin, PulpResolutionError
 
 
 @pytest.fixture(scope="session")
@@ -55,3 +59,94 @@ class TestOpenAPIGenerator:
             expected_content = EXPECTED_TEMPLATE.format(plugin_label=plugin.plugin_label)
             assert schema_file.exists()
             assert schema_file.read_text() == expected_content
+
+
+def test_generate_concurrently(tmp_path):
+    """Concurrent dry-run generation keeps the label-based output paths."""
+    plugins = [
+        OpenApiPlugin(repository_path=tmp_path / f"pulp_{label}", plugin_label=label)
+        for label in ("file", "rpm", "deb", "gem")
+    ]
+    generator = OpenAPIGenerator(plugins, dry_run=True, jobs=3)
+    label_to_specfile = generator.generate()
+
+    assert list(label_to_specfile) == ["file", "rpm", "deb", "gem"]
+    for label, schema_file in label_to_specfile.items():
+        assert schema_file.name == f"{label}-api.json"
+        expected_content = OpenAPIGenerator.DRY_RUN_SPECFILE_TEMPLATE.format(plugin_label=label)
+        assert schema_file.read_text() == expected_content
+
+
+def test_generate_concurrently_fails_fast(tmp_path, monkeypatch):
+    """The first resolution error is raised and other running subprocesses are terminated."""
+    plugins = [
+        OpenApiPlugin(repository_path=tmp_path / f"pulp_{label}", plugin_label=label)
+        for label in ("file", "rpm", "deb")
+    ]
+    generator = OpenAPIGenerator(plugins, jobs=3)
+    started = threading.Barrier(3)
+    procs = []
+
+    def fake_generate_schema(plugin_label, output_file):
+        started.wait()
+        if plugin_label == "rpm":
+            raise PulpResolutionError("can't resolve")
+        generator._run(["sleep", "30"])
+
+    def track_popen(*args, **kwargs):
+        proc = real_popen(*args, **kwargs)
+        procs.append(proc)
+        return proc
+
+    real_popen = subprocess.Popen
+    monkeypatch.setattr(subprocess, "Popen", track_popen)
+    monkeypatch.setattr(generator, "_generate_schema", fake_generate_schema)
+
+    start = time.monotonic()
+    with pytest.raises(PulpResolutionError):
+        generator.generate()
+    assert time.monotonic() - start < 10
+    assert all(proc.poll() is not None for proc in procs)
+
+
+def test_generate_shared_env(tmp_path, capsys):
+    """A shared environment installs each repository once and runs a single command."""
+    plugins = [
+        OpenApiPlugin(repository_path=tmp_path / "pulpcore", plugin_label="core"),
+        OpenApiPlugin(repository_path=tmp_path / "pulpcore", plugin_label="file"),
+        OpenApiPlugin(repository_path=tmp_path / "pulp_rpm", plugin_label="rpm"),
+    ]
+    generator = OpenAPIGenerator(plugins, dry_run=True, shared_env=True)
+    label_to_specfile = generator.generate()
+
+    output = capsys.readouterr().out
+    assert output.count("uv run") == 1
+    assert output.count(f"--with {tmp_path / 'pulpcore'} ") == 1
+    assert output.count(f"--with {tmp_path / 'pulp_rpm'} ") == 1
+    for label, schema_file in label_to_specfile.items():
+        expected_content = OpenAPIGenerator.DRY_RUN_SPECFILE_TEMPLATE.format(plugin_label=label)
+        assert schema_file.read_text() == expected_content
+
+
+def test_generate_shared_env_fallback(tmp_path, monkeypatch):
+    """When the shared environment can't be resolved, each plugin is isolated."""
+    plugins = [
+        OpenApiPlugin(repository_path=tmp_path / f"pulp_{label}", plugin_label=label)
+        for label in ("file", "rpm")
+    ]
+    generator = OpenAPIGenerator(plugins, shared_env=True)
+    isolated = []
+
+    def fake_generate_shared(labels, label_to_specfile):
+        raise PulpResolutionError("can't resolve")
+
+    def fake_generate_schema(plugin_label, output_file):
+        isolated.append(plugin_label)
+        output_file.write_text("{}")
+
+    monkeypatch.setattr(generator, "_generate_shared", fake_generate_shared)
+    monkeypatch.setattr(generator, "_generate_schema", fake_generate_schema)
+    label_to_specfile = generator.generate()
+
+    assert isolated == ["file", "rpm"]
+    assert all(schema_file.exists() for schema_file in label_to_specfile.values())
@@ -0,0 +1,242 @@
+import contextvars
+import threading
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+from git import Repo
+from mkdocs.config import load_config
+from mkdocs.config.defaults import MkDocsConfig
+from mkdocs.structure.files import Files
+from mkdocs.structure.nav import Section, get_navigation
+from watchdog.events import FileCreatedEvent
+
+from pulp_docs.cli import get_default_mkdocs
+from pulp_docs.context import ctx_cache_dir, ctx_openapi, ctx_path
+from pulp_docs.openapi import write_api_assets
+from pulp_docs.plugin import (
+    SITEMAP_PLACEHOLDER,
+    ComponentLoader,
+    ComponentSpec,
+    LoadedComponent,
+    LoadResult,
+    PulpDocsPlugin,
+    RSSFeed,
+    _render_sitemap,
+    list_docs,
+)
+
+MKDOCS_YML = """
+site_name: Test
+nav:
+  - Home: index.md
+  - User Manual: []
+  - Developer Manual: []
+plugins:
+  - literate-nav
+  - PulpDocs:
+      components:
+        - title: "Component A"
+          path: "A"
+          kind: "Content"
+"""
+
+TREE = """
+=== A/docs/index.md
+=== A/docs/user/guides/foo.md
+=== A/docs/dev/reference/bar.md
+"""
+
+
+@pytest.fixture
+def mkdocs_config(create_file, tmp_path: Path) -> MkDocsConfig:
+    create_file("pulp-docs/docs/index.md", "# Home")
+    mkdocs_file = create_file("pulp-docs/mkdocs.yml", MKDOCS_YML)
+    return load_config(str(mkdocs_file), site_dir=str(tmp_path / "site"))
+
+
+@pytest.fixture
+def plugin(mkdocs_config: MkDocsConfig, create_tree) -> PulpDocsPlugin:
+    basedir, _ = create_tree(TREE)
+    Repo.init(basedir / "A")
+    plugin = mkdocs_config.plugins["PulpDocs"]
+    plugin.loaded_comps = [
+        LoadedComponent(
+            spec=plugin.config.components[0],
+            repository_dir=basedir / "A",
+            pkg_version="1.0",
+            git_revision="unknown",
+            git_dirty=False,
+        )
+    ]
+    return plugin
+
+
+def src_uris(config: MkDocsConfig) -> list[str]:
+    config.nav = [{"Home": "index.md"}, {"User Manual": []}, {"Developer Manual": []}]
+    files = config.plugins.on_files(Files([]), config=config)
+    return sorted(f.src_uri for f in files)
+
+
+def test_on_files(plugin: PulpDocsPlugin, mkdocs_config: MkDocsConfig):
+    assert src_uris(mkdocs_config) == [
+        "A/docs/dev/index.md",
+        "A/docs/dev/reference/bar.md",
+        "A/docs/user/guides/foo.md",
+        "A/index.md",
+    ]
+    user_nav = mkdocs_config.nav[1]["User Manual"]
+    assert user_nav[0]["Content"][0]["Component A"][0] == "A/index.md"
+
+
+def test_on_files_reuses_unchanged_components(
+    plugin: PulpDocsPlugin, mkdocs_config: MkDocsConfig, create_file
+):
+    """Components are only re-collected after a change was detected in their docs."""
+    before = src_uris(mkdocs_config)
+    new_file = create_file("A/docs/user/guides/new.md", "# New")
+    assert src_uris(mkdocs_config) == before
+
+    component_dir = plugin.loaded_comps[0].component_dir
+    plugin._on_component_change(component_dir, FileCreatedEvent(str(new_file)))
+    assert src_uris(mkdocs_config) == sorted(before + ["A/docs/user/guides/new.md"])
+
+
+def test_on_files_uses_listing_from_loader(
+    plugin: PulpDocsPlugin, mkdocs_config: MkDocsConfig, create_file
+):
+    """Docs listed while loading (e.g, from the manifest) are not walked until they change."""
+    comp = plugin.loaded_comps[0]
+    plugin.loaded_comps = [replace(comp, docs_files=("index.md", "user/guides/foo.md"))]
+    assert src_uris(mkdocs_config) == ["A/docs/user/guides/foo.md", "A/index.md"]
+
+    new_file = create_file("A/docs/user/guides/new.md", "# New")
+    plugin._on_component_change(comp.component_dir, FileCreatedEvent(str(new_file)))
+    assert "A/docs/dev/reference/bar.md" in src_uris(mkdocs_config)
+    assert "A/docs/user/guides/new.md" in src_uris(mkdocs_config)
+
+
+def test_list_docs_order(create_tree):
+    basedir, _ = create_tree(
+        """
+        === docs/guides/x.md
+        === docs/guides/b/2.md
+        === docs/guides/a/1.md
+        === docs/guides/a/z/3.md
+        === docs/index.md
+        """
+    )
+    docs_files, _ = list_docs(basedir / "docs")
+    assert docs_files == [
+        "index.md",
+        "guides/x.md",
+        "guides/a/1.md",
+        "guides/a/z/3.md",
+        "guides/b/2.md",
+    ]
+
+
+def test_list_docs_follows_symlinks_without_cycles(create_tree, tmp_path: Path):
+    basedir, _ = create_tree(TREE)
+    docs_dir = basedir / "A/docs"
+    (docs_dir / "user/loop").symlink_to(docs_dir, target_is_directory=True)
+    (docs_dir / "shared").symlink_to(tmp_path / "shared", target_is_directory=True)
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "shared/baz.md").write_text("# Baz")
+
+    docs_files, docs_dirs = list_docs(docs_dir)
+    assert sorted(docs_files) == [
+        "dev/reference/bar.md",
+        "index.md",
+        "shared/baz.md",
+        "user/guides/foo.md",
+    ]
+    assert len(docs_dirs) == 6
+
+
+def test_list_docs_lists_shared_dirs_everywhere(create_tree, tmp_path: Path):
+    basedir, _ = create_tree(TREE)
+    docs_dir = basedir / "A/docs"
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "shared/baz.md").write_text("# Baz")
+    (docs_dir / "user/shared").symlink_to(tmp_path / "shared", target_is_directory=True)
+    (docs_dir / "dev/shared").symlink_to(tmp_path / "shared", target_is_directory=True)
+
+    docs_files, _ = list_docs(docs_dir)
+    assert "user/shared/baz.md" in docs_files
+    assert "dev/shared/baz.md" in docs_files
+
+
+def test_sitemap_sections_are_rendered_once(plugin: PulpDocsPlugin, mkdocs_config: MkDocsConfig):
+    mkdocs_config.nav = [{"Home": "index.md"}, {"User Manual": []}, {"Developer Manual": []}]
+    files = mkdocs_config.plugins.on_files(Files([]), config=mkdocs_config)
+    navigation = get_navigation(files, mkdocs_config)
+    mkdocs_config.plugins.on_nav(navigation, config=mkdocs_config, files=files)
+    sections = [item for item in navigation.items if isinstance(item, Section)]
+
+    cache: dict[int, str] = {}
+    assert [_render_sitemap(s, cache) for s in sections] == [_render_sitemap(s) for s in sections]
+    cache[id(sections[0])] = "<li>cached</li>"
+    assert _render_sitemap(sections[0], cache) == "<ul><li>cached</li></ul>"
+
+    index_page = next(page for page in navigation.pages if page.file.src_uri == "A/index.md")
+    index_page.content = f"<p>Intro</p><p>{SITEMAP_PLACEHOLDER}</p>"
+    plugin._render_page_sitemap(index_page)
+    assert index_page.content.startswith('<p>Intro</p><p><div class="pulp-sitemap"><ul><li>')
+    assert SITEMAP_PLACEHOLDER not in index_page.content
+
+
+def test_nav_is_not_shared_between_builds(plugin: PulpDocsPlugin, mkdocs_config: MkDocsConfig):
+    src_uris(mkdocs_config)
+    first_nav = mkdocs_config.nav
+    src_uris(mkdocs_config)
+    first_nav[1]["User Manual"][0]["Content"][0]["Component A"].clear()
+    assert mkdocs_config.nav[1]["User Manual"][0]["Content"][0]["Component A"]
+
+
+def test_api_json_assets_are_copied_from_disk(
+    plugin: PulpDocsPlugin, mkdocs_config: MkDocsConfig, create_file
+):
+    spec_file = create_file("specs/a-api.json", '{\n  "openapi": "3.0.3"\n}')
+    write_api_assets(spec_file)
+    comp_spec = ComponentSpec.validate(
+        {"path": "A", "title": "Component A", "kind": "Content", "rest_api": "a"}
+    )
+    plugin.loaded_comps = [replace(plugin.loaded_comps[0], spec=comp_spec, openapi_spec=spec_file)]
+    mkdocs_config.nav = [{"Home": "index.md"}, {"User Manual": []}, {"Developer Manual": []}]
+    files = mkdocs_config.plugins.on_files(Files([]), config=mkdocs_config)
+
+    api_json = files.get_file_from_path("A/api.json")
+    assert files.get_file_from_path("A/api.json.gz")
+    assert api_json.generated_by == "PulpDocs"
+    assert Path(api_json.abs_src_path).parent == spec_file.parent / "a-api-assets"
+    api_json.copy_file()
+    assert Path(api_json.abs_dest_path).read_text() == '{"openapi":"3.0.3"}'
+
+
+def test_rebuild_from_another_thread(tmp_path: Path, monkeypatch):
+    """mkdocs serve rebuilds in a thread where the context variables have their defaults."""
+    config = load_config(str(get_default_mkdocs()), site_dir=str(tmp_path / "site"))
+    plugin = config.plugins["PulpDocs"]
+    load_calls = []
+
+    def load_all(self, generate_openapi=False):
+        load_calls.append((self.lookup_paths, generate_openapi))
+        return LoadResult(all_specs=[], loaded=[], missing=[])
+
+    monkeypatch.setattr(ComponentLoader, "load_all", load_all)
+    monkeypatch.setattr(RSSFeed, "start", lambda self: None)
+
+    def serve():
+        ctx_path.set([str(tmp_path)])
+        ctx_openapi.set(False)
+        ctx_cache_dir.set(tmp_path / "cache")
+        plugin.on_startup(command="serve", dirty=False)
+        plugin.on_config(config)
+
+    contextvars.copy_context().run(serve)
+    rebuild = threading.Thread(target=plugin.on_config, args=(config,))
+    rebuild.start()
+    rebuild.join()
+    assert load_calls == [([str(tmp_path)], False)]
+    assert plugin.cache_dir == tmp_path / "cache"
@@ -0,0 +1,47 @@
+import json
+import threading
+
+from pulp_docs.profiling import BuildProfiler
+
+
+def test_nested_phases(tmp_path):
+    profiler = BuildProfiler()
+    with profiler.phase("outer"):
+        with profiler.phase("inner", component="pulpcore"):
+            data = bytearray(4 * 1024 * 1024)
+        del data
+
+    events = {e["name"]: e for e in profiler.events}
+    assert events["inner"]["args"]["component"] == "pulpcore"
+    # the allocation peak of the inner phase is also a peak of the outer phase
+    assert events["inner"]["args"]["peak_memory_kb"] >= 4 * 1024
+    assert events["outer"]["args"]["peak_memory_kb"] >= 4 * 1024
+    assert events["outer"]["dur"] >= events["inner"]["dur"]
+
+    trace_file = tmp_path / "trace.json"
+    profiler.write(trace_file)
+    trace = json.loads(trace_file.read_text())
+    assert [e["name"] for e in trace["traceEvents"]] == ["outer", "inner"]
+    assert trace["otherData"]["totals"]["inner"]["count"] == 1
+
+
+def test_concurrent_phases():
+    profiler = BuildProfiler()
+
+    def work(i):
+        with profiler.phase("load_component", component=str(i)):
+            pass
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert profiler.totals()["load_component"]["count"] == 8
+
+
+def test_disabled():
+    profiler = BuildProfiler(enabled=False)
+    with profiler.phase("noop"):
+        pass
+    assert profiler.events == []
@@ -0,0 +1,89 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from pulp_docs.rss import FEED_UNAVAILABLE, RSSFeed
+
+ETAG = '"v1"'
+ITEMS = [{"url": f"https://example.com/{i}", "title": f"Item {i}"} for i in range(30)]
+
+
+class FeedServer(ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FeedHandler)
+        self.requests: list[dict[str, str]] = []
+        self.delay = threading.Event()
+        self.delay.set()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/feed.json"
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    server: FeedServer
+
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        self.server.delay.wait()
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps({"items": ITEMS}).encode()
+        self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = FeedServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.delay.set()
+    server.shutdown()
+    server.server_close()
+
+
+def fetch_items(url: str, cache_file: Path, **kwargs) -> list:
+    feed = RSSFeed(url, cache_file, **kwargs)
+    feed.start()
+    return feed.items()
+
+
+def test_items_are_cached(server: FeedServer, tmp_path: Path):
+    cache_file = tmp_path / "feed.json"
+    assert fetch_items(server.url, cache_file) == ITEMS[:20]
+    assert fetch_items(server.url, cache_file) == ITEMS[:20]
+    assert len(server.requests) == 1
+
+
+def test_stale_items_are_revalidated(server: FeedServer, tmp_path: Path):
+    cache_file = tmp_path / "feed.json"
+    fetch_items(server.url, cache_file, ttl=0)
+    assert fetch_items(server.url, cache_file, ttl=0) == ITEMS[:20]
+    assert [request.get("If-None-Match") for request in server.requests] == [None, ETAG]
+
+
+def test_last_good_copy_is_served_when_fetch_fails(server: FeedServer, tmp_path: Path):
+    cache_file = tmp_path / "feed.json"
+    fetch_items(server.url, cache_file)
+    unreachable_url = "http://127.0.0.1:1/feed.json"
+    assert fetch_items(unreachable_url, cache_file, ttl=0) == ITEMS[:20]
+
+
+def test_slow_fetch_does_not_block(server: FeedServer, tmp_path: Path):
+    server.delay.clear()
+    feed = RSSFeed(server.url, tmp_path / "feed.json")
+    feed.start()
+    assert feed.items(wait=0.1) == FEED_UNAVAILABLE